@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -7,7 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 import os
-import traceback
+import errno
 import socket
 import pandas as pd
 import shutil
@@ -22,10 +22,15 @@ config.read('settings.ini', encoding='utf-8')
 
 #ポップアップ対処用関数
 def handle_popup(driver, LOGGER):
+    popup_xpath = '/html/body/div[3]/div/div/div[3]/button'
     try:
-        # ポップアップのOKボタンをクリック可能になるまで待機
-        ok_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '/html/body/div[3]/div/div/div[3]/button'))
+        # find_elementsは要素が無ければ空リストを返すため、ポップアップが無い場合は待機せずに終了
+        if not driver.find_elements(By.XPATH, popup_xpath):
+            LOGGER.error("ポップアップは表示されませんでした")
+            return
+        # ポップアップのOKボタンをクリック可能になるまで待機（表示済みのため短い間隔で確認する）
+        ok_button = WebDriverWait(driver, 10, poll_frequency=0.1).until(
+            EC.element_to_be_clickable((By.XPATH, popup_xpath))
         )
         driver.execute_script("arguments[0].scrollIntoView(true);", ok_button)
         ok_button.click()
@@ -48,6 +53,20 @@ def wait_and_click(driver, by, value, timeout=30):
         LOGGER.error(f"要素をクリックできませんでした: {by}={value}")
         return False
 
+# 日付入力フィールドに値を設定し、入力後の値を返す
+_SET_DATE_RANGE_SCRIPT = """
+const fields = [[arguments[0], arguments[2]], [arguments[1], arguments[3]]];
+for (const [el, value] of fields) {
+    el.value = value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return [arguments[0].value, arguments[1].value];
+"""
+
+def set_date_range_js(driver, start_input, end_input, start_date_str, end_date_str):
+    return driver.execute_script(_SET_DATE_RANGE_SCRIPT, start_input, end_input, start_date_str, end_date_str)
+
 #詳細分析ページとかで日付選択をするための関数
 def select_and_input_date(driver, start_date_str, end_date_str):
     try:
@@ -60,35 +79,20 @@ def select_and_input_date(driver, start_date_str, end_date_str):
         LOGGER.debug(f"日付カレンダーをクリックしました: {start_date_picker_trigger.get_attribute('outerHTML')}")
         time.sleep(3)
 
-        # 「いつから」の日付入力フィールドに指定された日付をsend_keysで設定
+        # 「いつから」「いつまで」の日付入力フィールドを取得
         LOGGER.debug(f"開始日フィールドを探しています")
         start_date_input = WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.XPATH, '/html/body/div[1]/div[2]/div[2]/div[1]/div[2]/nav/div[2]/div[1]/div/div[2]/div[2]/div[2]/div[1]/div[1]/input[1]'))
         )
-
-        # フィールドを完全にクリア
-        driver.execute_script("arguments[0].value = '';", start_date_input)
-        time.sleep(1)  # 短い待機時間を追加
-        start_date_input.send_keys(start_date_str)
-        LOGGER.debug(f"開始日フィールドに {start_date_str} を入力しました: {start_date_input.get_attribute('outerHTML')}")
-        time.sleep(1)
-
-        # 「いつまで」の日付入力フィールドに指定された日付をsend_keysで設定
         LOGGER.debug(f"終了日フィールドを探しています")
         end_date_input = WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.XPATH, '/html/body/div[1]/div[2]/div[2]/div[1]/div[2]/nav/div[2]/div[1]/div/div[2]/div[2]/div[2]/div[1]/div[1]/input[2]'))
         )
 
-        # フィールドを完全にクリア
-        driver.execute_script("arguments[0].value = '';", end_date_input)
-        time.sleep(1)  # 短い待機時間を追加
-        end_date_input.send_keys(end_date_str)
-        LOGGER.debug(f"終了日フィールドに {end_date_str} を入力しました: {end_date_input.get_attribute('outerHTML')}")
-        time.sleep(1)
-
-        # 日付フィールドの最終確認（値が正しく反映されているか）
-        start_date_final = driver.execute_script("return arguments[0].value;", start_date_input)
-        end_date_final = driver.execute_script("return arguments[0].value;", end_date_input)
+        # 両フィールドへの入力と値の確認を1回のスクリプト実行でまとめて行う
+        start_date_final, end_date_final = set_date_range_js(
+            driver, start_date_input, end_date_input, start_date_str, end_date_str
+        )
         LOGGER.debug(f"最終確認: 開始日 {start_date_final}, 終了日 {end_date_final}")
 
         if start_date_final != start_date_str or end_date_final != end_date_str:
@@ -111,14 +115,40 @@ def select_and_input_date(driver, start_date_str, end_date_str):
     except NoSuchElementException as e:
         LOGGER.error(f"日付入力フィールドが見つかりませんでした: {e}")
 
-#ブラウザのセットアップ
-def setup_browser(config):
-    options = webdriver.ChromeOptions()
+#ダウンロード先フォルダの取得（ユーザーのDownloadsが無ければ設定ファイルのパス）
+def get_download_path(config):
     username = os.getenv('USERNAME')
     download_path = f"C:\\Users\\{username}\\Downloads"
     
     if not os.path.exists(download_path):
         download_path = config['Paths']['downloads']
+    return download_path
+
+#ダウンロード完了待ち（ファイル名にkeywordを含むCSVがstarted_at以降に出来上がったら終了）
+def wait_for_download(download_path, keyword, started_at, timeout, poll_interval=0.5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with os.scandir(download_path) as it:
+            for entry in it:
+                if (keyword in entry.name and not entry.name.endswith('.crdownload')
+                        and entry.is_file() and entry.stat().st_mtime >= started_at):
+                    LOGGER.debug(f"ダウンロード完了を確認しました: {entry.name}")
+                    return True
+        time.sleep(poll_interval)
+    LOGGER.error(f"ダウンロードが{timeout}秒以内に完了しませんでした: {keyword}")
+    return False
+
+#ブラウザ起動後にダウンロード先フォルダを変更する（setup_browserでsend_commandを登録済みであること）
+def set_download_dir(driver, download_path):
+    driver.execute("send_command", params={
+        'cmd': 'Page.setDownloadBehavior',
+        'params': {'behavior': 'allow', 'downloadPath': download_path}
+    })
+
+#ブラウザのセットアップ
+def setup_browser(config):
+    options = webdriver.ChromeOptions()
+    download_path = get_download_path(config)
     
     options.add_experimental_option('prefs', {
         'download.prompt_for_download': False,
@@ -130,10 +160,7 @@ def setup_browser(config):
     driver = webdriver.Chrome(service=service, options=options)
     
     driver.command_executor._commands["send_command"] = ("POST", '/session/$sessionId/chromium/send_command')
-    driver.execute("send_command", params={
-        'cmd': 'Page.setDownloadBehavior',
-        'params': {'behavior': 'allow', 'downloadPath': download_path}
-    })
+    set_download_dir(driver, download_path)
     driver.maximize_window()
     # アドエビスログイン画面へのアクセス
     adebis_login = config.get('Credentials', 'login_url')
@@ -142,29 +169,44 @@ def setup_browser(config):
     return driver
 
 # ログイン処理
+# ログインフォームの各入力欄（name属性で指定）に値を設定し、見つからなかった入力欄の名前を返す
+_FILL_LOGIN_FORM_SCRIPT = """
+const missing = [];
+for (const [name, value] of arguments[0]) {
+    const el = document.getElementsByName(name)[0];
+    if (!el) { missing.push(name); continue; }
+    el.value = value;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return missing;
+"""
+
 def login_to_adebis(driver, config):
     try:
-        account_key = WebDriverWait(driver, 30).until(
+        # フォームの表示を待ってから、3つの入力欄へ1回のスクリプト実行でまとめて入力
+        WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.NAME, 'account_key'))
         )
-        account_key.send_keys(config['Credentials']['account_key'])
-
-        username = WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.NAME, 'username'))
-        )
-        username.send_keys(config['Credentials']['username'])
-
-        password = WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.NAME, 'password'))
-        )
-        password.send_keys(config['Credentials']['password'])
+        missing = driver.execute_script(_FILL_LOGIN_FORM_SCRIPT, [
+            ['account_key', config['Credentials']['account_key']],
+            ['username', config['Credentials']['username']],
+            ['password', config['Credentials']['password']],
+        ])
+        if missing:
+            raise NoSuchElementException(f"入力フィールドが見つかりません: {', '.join(missing)}")
 
         login_btn = WebDriverWait(driver, 30).until(
             EC.element_to_be_clickable((By.NAME, 'login'))
         )
+        start_url = driver.current_url
         login_btn.click()
+        # ログイン後のリダイレクトを待機（URLが変わった時点で次へ進む）
+        try:
+            WebDriverWait(driver, 30, poll_frequency=0.25).until(EC.url_changes(start_url))
+        except TimeoutException:
+            LOGGER.warning("ログイン後のリダイレクトを確認できませんでしたが、処理を続行します")
         LOGGER.info("ログインしました")
-        time.sleep(5)
 
         return True  # ログイン成功を返す
     except Exception as e:
@@ -172,7 +214,7 @@ def login_to_adebis(driver, config):
         return False  # ログイン失敗を返す
 
 # SS_CVデータ取得
-def download_ss_cv_data(driver, start_date_str, end_date_str):
+def download_ss_cv_data(driver, start_date_str, end_date_str, download_path):
     adebis_details = config.get('Credentials', 'url_details')
     driver.get(adebis_details)    
     LOGGER.info("詳細分析に入りました")
@@ -185,6 +227,7 @@ def download_ss_cv_data(driver, start_date_str, end_date_str):
     time.sleep(10)  # ページ読み込み待機
 
     # インポートを押す
+    started_at = time.time()
     if not wait_and_click(driver, By.XPATH, '//*[@id="common-bar"]/div[2]/nav/div[2]/div[4]/div[1]'):
         print("インポートボタンをクリックできませんでした")
 
@@ -192,12 +235,14 @@ def download_ss_cv_data(driver, start_date_str, end_date_str):
     if not wait_and_click(driver, By.XPATH, '//*[@id="common-bar"]/div[2]/nav/div[2]/div[4]/div[2]/a'):
         print("ダウンロードボタンをクリックできませんでした")
 
-    time.sleep(30)
+    if not wait_for_download(download_path, 'detail_analyze', started_at, timeout=30):
+        return False
 
     print("SSとCVのデータダウンロードが完了しました。")
+    return True
 
 # CV属性ファイル取得
-def download_cv_attribute_report(driver, start_date_str, end_date_str):
+def download_cv_attribute_report(driver, start_date_str, end_date_str, download_path):
     driver.get(config.get('Credentials', 'url_cvrepo'))
     LOGGER.debug("CV属性レポートページに入りました")
 
@@ -211,55 +256,63 @@ def download_cv_attribute_report(driver, start_date_str, end_date_str):
     tab = WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH,'//*[@id="navbar"]/nav/a[2]'))).click()
 
     # 属性レポート_CSVダウンロード
+    started_at = time.time()
     if not wait_and_click(driver, By.XPATH, '//*[@id="common-bar"]/div[2]/nav/div[2]/div[4]/div[1]'):
         print("CSVボタンをクリックできませんでした")
 
     if not wait_and_click(driver, By.XPATH, '//*[@id="common-bar"]/div[2]/nav/div[2]/div[4]/div[2]/a'):
         print("CSVダウンロードボタンをクリックできませんでした")
 
-    time.sleep(90)
+    if not wait_for_download(download_path, 'cv_attr', started_at, timeout=90):
+        return False
     print('CV属性ファイルダウンロード完了')
+    return True
 
-# データを取得する日付の指定
-def process_downloaded_data(config):
-    # 日数の設定を取得
+# ファイル移動（同一ファイルシステムならリネームのみ、別デバイスならコピーして削除）
+def move_file(src_path, dst_path):
+    try:
+        os.replace(src_path, dst_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        os.unlink(src_path)
+
+#対象日の算出（settings.iniのdays_ago日前）
+def get_target_date(config):
     days_ago = int(config['DownloadSettings']['days_ago'])
+    return date.today() - timedelta(days=days_ago)
 
-    # 日付データ作成
-    today = datetime.today()
-    target_date = today - timedelta(days=days_ago)
-
-    passdate_past = str(datetime.strftime(target_date, '%Y/%m/%d'))
-    passdate_past2 = str(datetime.strftime(target_date, '%Y%m%d'))
+# データを取得する日付の指定
+def process_downloaded_data(config, target_date=None):
+    # 日付データ作成（呼び出し元で算出済みならそれを使う）
+    if target_date is None:
+        target_date = get_target_date(config)
 
-    # デバイスのユーザー名を取得
-    username = os.getenv('USERNAME')
-    download_path = f"C:\\Users\\{username}\\Downloads"
-    
-    if not os.path.exists(download_path):
-        LOGGER.error(f"警告: 生成されたダウンロードパスが存在しません: {download_path}")
-        LOGGER.debug("設定ファイルのパスを使用します。")
-        download_path = config['Paths']['downloads']
-    
-    LOGGER.debug(f"使用するダウンロードパス: {download_path}")
+    passdate_past = target_date.strftime('%Y/%m/%d')
+    passdate_past2 = target_date.strftime('%Y%m%d')
 
-    # ファイルパス指定
+    # ファイルパス指定（ダウンロードは保存先フォルダへ直接行われる）
     moveto = config['Paths']['moveto']
+    download_path = moveto
+    LOGGER.debug(f"使用するダウンロードパス: {download_path}")
     conecter = '\\'
 
     try:
         # SSとCVのデータを処理
         new_path = moveto + conecter + passdate_past2 + "_ebis_SS_CV.csv"
-        dl_files = os.listdir(download_path)
-        dl_files_file = [f for f in dl_files if os.path.isfile(os.path.join(download_path, f))]
-        SS_CV_csv = [s for s in dl_files_file if 'detail_analyze' in s]
+        # scandirで1回だけ走査し、DirEntryのキャッシュ済みstat情報を使う
+        with os.scandir(download_path) as it:
+            dl_entries = [e for e in it if e.is_file()]
+        SS_CV_csv = [e for e in dl_entries if 'detail_analyze' in e.name]
         
         if not SS_CV_csv:
-            LOGGER.error(f"SSとCVのデータファイルが見つかりません。ディレクトリ内のファイル: {dl_files}")
+            LOGGER.error(f"SSとCVのデータファイルが見つかりません。ディレクトリ内のファイル: {[e.name for e in dl_entries]}")
             return None, None, None
 
-        SS_CV_csv_path = os.path.join(download_path, SS_CV_csv[-1])
-        shutil.move(SS_CV_csv_path, new_path)
+        SS_CV_csv_path = max(SS_CV_csv, key=lambda e: e.stat().st_mtime).path
+        move_file(SS_CV_csv_path, new_path)
         LOGGER.info("DLしたデータを所定のフォルダに移動させました")
 
         SSCV_df = pd.read_csv(new_path, encoding='cp932', usecols=['広告名','クリック数','応募完了（CV）'])
@@ -278,14 +331,14 @@ def process_downloaded_data(config):
         LOGGER.info("SSとCVのデータを作成しました。")
 
         # CV属性レポートを処理
-        CVrepo_csv = [s for s in dl_files_file if 'cv_attr' in s]
+        CVrepo_csv = [e for e in dl_entries if 'cv_attr' in e.name]
         if not CVrepo_csv:
             LOGGER.error("CV属性レポートファイルが見つかりません")
             return SS_df, CV_df, None
 
-        CVrepo_path = os.path.join(download_path, CVrepo_csv[-1])
+        CVrepo_path = max(CVrepo_csv, key=lambda e: e.stat().st_mtime).path
         new_path2 = moveto + conecter + passdate_past2 + "_ebis_CVrepo.csv"
-        shutil.move(CVrepo_path, new_path2)
+        move_file(CVrepo_path, new_path2)
         LOGGER.debug('CV属性ファイル移動完了')
 
         CVrepo_df = pd.read_csv(new_path2, encoding='cp932')
@@ -295,27 +348,29 @@ def process_downloaded_data(config):
         return SS_df, CV_df, CVrepo_df
 
     except Exception as e:
-        LOGGER.error(f"エラー: ファイルの処理中に問題が発生しました: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        LOGGER.exception(f"エラー: ファイルの処理中に問題が発生しました: {str(e)}")
         return None, None, None
 
 #ログイン→データDL→DLしたファイルの処理をまとめて実施
 def perform_adebis_operations(config):
     driver = setup_browser(config)
     
-    # 日付設定を取得
-    days_ago = int(config['DownloadSettings']['days_ago'])
-    today = datetime.today()
-    target_date = today - timedelta(days=days_ago)
+    # 日付設定を取得（ダウンロードとファイル処理で同じ日付を使う）
+    target_date = get_target_date(config)
     passdate_past = target_date.strftime('%Y/%m/%d')
 
     try:
         if login_to_adebis(driver, config):
-            time.sleep(5)  # ログイン後少し待機
-            download_ss_cv_data(driver, passdate_past, passdate_past)
-            download_cv_attribute_report(driver, passdate_past, passdate_past)
-            SS_df, CV_df, CVrepo_df = process_downloaded_data(config)
+            # 保存先フォルダへ直接ダウンロードさせ、後処理はフォルダ内のリネームだけにする
+            download_path = config['Paths']['moveto']
+            set_download_dir(driver, download_path)
+            if not download_ss_cv_data(driver, passdate_past, passdate_past, download_path):
+                LOGGER.error("SSとCVのデータをダウンロードできなかったため、処理を中止します")
+                return None, None, None
+            if not download_cv_attribute_report(driver, passdate_past, passdate_past, download_path):
+                LOGGER.error("CV属性ファイルをダウンロードできなかったため、処理を中止します")
+                return None, None, None
+            SS_df, CV_df, CVrepo_df = process_downloaded_data(config, target_date)
             return SS_df, CV_df, CVrepo_df
         else:
             LOGGER.error("ログインに失敗しました")
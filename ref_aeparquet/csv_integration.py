@@ -43,19 +43,29 @@
 
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
 import configparser  # 必要なインポートを追加
 
-def append_csv_data(source_file, destination_file):
+# 追記時に一度に読み込む行数
+APPEND_CHUNK_SIZE = 50_000
+
+def append_csv_data(source_file, destination_file, chunksize=APPEND_CHUNK_SIZE):
     try:
-        source_df = pd.read_csv(source_file, encoding='cp932')
-        source_df.to_csv(destination_file, mode='a', header=False, index=False, encoding='cp932')
+        # 大きなCSVでもメモリに載せきらないよう、一定行数ずつ読み込んで追記する
+        # （チャンクごとに型推論が変わらないよう、値は文字列のまま書き戻す）
+        # 追記先はチャンクごとに開き直さず、一度だけ開いて書き込む
+        with pd.read_csv(source_file, encoding='cp932', dtype=str, keep_default_na=False,
+                         chunksize=chunksize) as reader, \
+                open(destination_file, 'a', encoding='cp932', newline='') as out:
+            for chunk in reader:
+                chunk.to_csv(out, header=False, index=False)
         logging.info(f"{source_file} のデータを {destination_file} に追加しました。")
     except Exception as e:
         logging.error(f"{source_file} の処理中にエラーが発生しました: {str(e)}")
 
-def integrate_csv_files(config):
+def integrate_csv_files(config, max_workers=None):
     # 設定ファイルからパス情報を取得
     moveto_folder = config['Paths']['moveto']
     set_folder = config['Paths']['set_folder']
@@ -72,15 +82,25 @@ def integrate_csv_files(config):
         f"{date_str}_SS.csv": 'AE_SSresult.csv'
     }
 
+    targets = []
     for source_file, dest_file in files.items():
         source_path = os.path.join(moveto_folder, source_file)
         dest_path = os.path.join(set_folder, dest_file)
 
         if os.path.exists(source_path):
-            append_csv_data(source_path, dest_path)
+            targets.append((source_path, dest_path))
         else:
             logging.warning(f"ファイルが見つかりません: {source_path}")
 
+    if not targets:
+        return
+
+    # 追記先はファイルごとに異なるため、各ファイルの読み込み・追記を並行して行う
+    # （エラーはappend_csv_data内でログに出力される）
+    with ThreadPoolExecutor(max_workers=max_workers or len(targets)) as executor:
+        for source_path, dest_path in targets:
+            executor.submit(append_csv_data, source_path, dest_path)
+
 if __name__ == "__main__":
     # 設定ファイルを読み込み
     import configparser
@@ -4,7 +4,6 @@ import pyarrow as pa
 import pyarrow.parquet as pq
 import logging
 import csv
-import re
 
 def dedup_columns(columns):
     seen = set()
@@ -19,53 +18,40 @@ def dedup_columns(columns):
         result.append(item)
     return result
 
-def check_and_clean_csv(file_path, expected_fields):
+def check_and_clean_csv(file_path):
     cleaned_rows = []
     with open(file_path, 'r', encoding='cp932') as f:
         reader = csv.reader(f)
         headers = next(reader)  # ヘッダー行を保存
         headers = [h.strip() for h in headers if h.strip()]  # 空のヘッダーを削除
+        expected_fields = len(headers)  # 期待するフィールド数はヘッダーの列数（ファイルを開き直して数えない）
         headers = dedup_columns(headers)
-        sales_amount_index = headers.index('売上金額') if '売上金額' in headers else -1  # 売上金額の列インデックスを取得
         cleaned_rows.append(headers)
         for i, row in enumerate(reader, 2):  # 2から始めるのは、ヘッダー行を考慮するため
             if len(row) != expected_fields:
                 logging.warning(f"行 {i}: 予期しないフィールド数 {len(row)}, 期待値 {expected_fields}")
                 row = row[:expected_fields] + [''] * (expected_fields - len(row))  # 切り捨てまたは埋める
-            cleaned_row = []
-            for index, field in enumerate(row):
-                if index == sales_amount_index:
-                    cleaned_row.append(convert_currency(field))  # 売上金額の列だけ変換
-                else:
-                    cleaned_row.append(field)  # その他の列はそのまま
-            cleaned_rows.append(cleaned_row)
+            cleaned_rows.append(row)
     return cleaned_rows
 
-def convert_currency(field):
-    # 数値のみを抽出
-    numeric_value = re.sub(r'[^\d.]', '', field)
+def convert_currency(series):
+    # 列全体から数値以外の文字をまとめて除去（行ごとにPython関数を呼ばない）
+    numeric_values = series.str.replace(r'[^\d.]', '', regex=True)
     
-    # 抽出した数値が空でない場合、それを返す
-    if numeric_value:
-        return numeric_value
-    
-    # 数値が抽出できなかった場合、元の値をそのまま返す
-    return field
-
-def get_csv_field_count(file_path):
-    with open(file_path, 'r', encoding='cp932') as f:
-        reader = csv.reader(f)
-        headers = next(reader)
-        return len([h for h in headers if h.strip()])
+    # 数値が抽出できなかった値は元の値をそのまま残す
+    return numeric_values.where(numeric_values != '', series)
 
 def csv_to_parquet(csv_file, parquet_file):
     try:
-        expected_fields = get_csv_field_count(csv_file)
-        cleaned_rows = check_and_clean_csv(csv_file, expected_fields)
+        cleaned_rows = check_and_clean_csv(csv_file)
         
         # クリーニングされたデータをDataFrameに変換
         df = pd.DataFrame(cleaned_rows[1:], columns=cleaned_rows[0])
         
+        # 売上金額の列だけ数値に整形
+        if '売上金額' in df.columns:
+            df['売上金額'] = convert_currency(df['売上金額'])
+        
         # すべての列をobject型に変換
         df = df.astype('object')
         
@@ -77,9 +63,7 @@ def csv_to_parquet(csv_file, parquet_file):
         pq.write_table(table, parquet_file)
         logging.info(f"{csv_file} を Parquet ファイルに変換しました: {parquet_file}")
     except Exception as e:
-        logging.error(f"{csv_file} の変換中にエラーが発生しました: {str(e)}")
-        import traceback
-        logging.error(traceback.format_exc())
+        logging.exception(f"{csv_file} の変換中にエラーが発生しました: {str(e)}")
 
 def convert_csv_to_parquet(config):
     set_folder = config['Paths']['set_folder']
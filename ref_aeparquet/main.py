@@ -4,7 +4,6 @@ from csv_integration import integrate_csv_files
 from csv_to_parquet import convert_csv_to_parquet
 from my_logging import setup_department_logger
 import logging
-import traceback
 import slack_notify  
 
 # ロガーを設定
@@ -30,9 +29,8 @@ def main():
 
         LOGGER.info("すべての処理が完了しました。")
     except Exception as e:
-        # エラーログを記録
-        error_message = traceback.format_exc()
-        LOGGER.error(f"エラーが発生しました: {error_message}")
+        # エラーログを記録（スタックトレースはロガーが出力時に整形する）
+        LOGGER.exception(f"エラーが発生しました: {str(e)}")
 
         # Slackにエラー通知を送信
         config = configparser.ConfigParser()
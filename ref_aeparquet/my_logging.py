@@ -1,5 +1,4 @@
 import logging
-import traceback
 from logging.handlers import RotatingFileHandler
 import configparser
 import sys 
@@ -11,9 +10,8 @@ def setup_global_exception_logging(logger):
             sys.__excepthook__(exc_type, exc_value, exc_traceback)
             return
 
-        # 未処理例外の詳細情報を含むエラーメッセージを生成
-        error_message = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
-        logger.error("Uncaught exception: %s", error_message)
+        # 未処理例外の詳細情報はexc_infoで渡し、整形はハンドラに任せる
+        logger.error("Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback))
 
     sys.excepthook = handle_exception
 
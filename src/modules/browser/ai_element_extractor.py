@@ -10,19 +10,22 @@ import time
 import argparse
 import re
 import json
+import hashlib
 import os
 import pickle
 from pathlib import Path
+from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
 
 # プロジェクトルートへのパスを追加
 project_root = str(Path(__file__).parent.parent.parent.parent)
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from src.modules.browser.browser import Browser
@@ -32,6 +35,97 @@ from src.utils.environment import EnvironmentUtils as env
 
 logger = get_logger(__name__)
 
+# ログイン状態の判定に使うページ内の目印（いずれかが含まれていれば該当すると判定する）
+_DASHBOARD_TEXT_MARKERS = ('ダッシュボード', 'ログアウト', 'マイアカウント')
+_DASHBOARD_ATTR_MARKERS = ('bishamon-header', 'account-menu')
+_DASHBOARD_MARKERS_RE = re.compile('|'.join(map(re.escape, _DASHBOARD_TEXT_MARKERS + _DASHBOARD_ATTR_MARKERS)))
+# 同じ目印をブラウザ内で探すXPath（待機中にページソース全体を転送せずに判定するため）
+_DASHBOARD_MARKERS_XPATH = '//*[{}]'.format(' or '.join(
+    [f"contains(@class, '{m}') or contains(@id, '{m}')" for m in _DASHBOARD_ATTR_MARKERS]
+    + [f"text()[contains(., '{m}')]" for m in _DASHBOARD_TEXT_MARKERS]
+))
+_LOGIN_MARKERS_RE = re.compile('|'.join(map(re.escape, [
+    'loginForm',
+    'ログインする',
+    'ログインページ',
+    'ユーザー名',
+    'パスワード',
+    'アカウントキー'
+])))
+
+# 指示ファイル・操作文の解析に使う正規表現
+_NUMBERED_OPERATION_RE = re.compile(r'^\d+\.\s+(.+)$')
+_QUOTED_VALUE_RE = re.compile(r'[「""](.*?)[」""]')
+_WAIT_SECONDS_RE = re.compile(r'(\d+)\s*秒')
+
+# 操作文に含まれるキーワードと実行メソッドの対応（上から順に判定する）
+_OPERATION_HANDLERS = (
+    ('クリック', '_perform_click_operation'),
+    ('入力', '_perform_input_operation'),
+    ('選択', '_perform_select_operation'),
+    ('待機', '_perform_wait_operation'),
+)
+
+# URLからファイル名を作る際に "_" に置き換える文字
+_FILENAME_TRANSLATION = str.maketrans({'.': '_', '/': '_'})
+
+# 要素抽出に使用するモデル
+_EXTRACTION_MODEL = "gpt-3.5-turbo"
+
+# 要素抽出のシステムプロンプト（毎回同じ内容のため先頭に置き、OpenAIのプロンプトキャッシュが効くようにする）
+_EXTRACTION_SYSTEM_PROMPT = """
+あなたはウェブページ解析の専門家です。ユーザーから提供されたHTML要素を分析して、
+要素情報を抽出してください。
+
+以下の情報を各要素に対して特定してください：
+1. 要素のタイプ（入力フィールド、ボタン、リンクなど）
+2. 最適なセレクタ（ID、name、CSS、XPathの順で優先度が高い）
+3. 要素の属性情報（name, placeholder, valueなど）
+4. 表示テキスト（該当する場合）
+5. Seleniumで要素を操作するための最適な方法
+
+応答は必ずJSON形式で返してください。各要素の情報を含む配列として構造化してください。
+
+# 必要な出力
+指示内容とHTMLコンテンツに基づいて、各要素の情報を抽出してJSON形式で返してください。
+各要素について以下の情報を含めてください：
+1. element_name: 要素の名前（指示内容の要素リストに対応）
+2. element_type: 要素の種類（input, button, link, select など）
+3. selectors: 要素を特定するためのセレクタ（複数の方法）
+   - id: ID属性によるセレクタ（存在する場合）
+   - name: name属性によるセレクタ（存在する場合）
+   - css: CSSセレクタ（最も具体的で一意なもの）
+   - xpath: XPath（最も具体的で一意なもの）
+4. attributes: 要素の主要な属性（type, placeholder, valueなど）
+5. visible_text: 表示テキスト（ボタンやリンクの場合）
+6. recommendations: Seleniumでの操作方法の推奨事項
+
+レスポンスは必ず以下のようなJSON形式にしてください:
+```json
+{
+  "elements": [
+    {
+      "element_name": "アカウントID入力フィールド",
+      "element_type": "input",
+      "selectors": {
+        "id": "account_key",
+        "name": "account_key",
+        "css": "#account_key",
+        "xpath": "//input[@id='account_key']"
+      },
+      "attributes": {
+        "type": "text",
+        "placeholder": "アカウントID"
+      },
+      "visible_text": "",
+      "recommendations": "WebDriverWait と presence_of_element_located を使用し、テキストを送信する"
+    },
+    ...
+  ]
+}
+```
+"""
+
 class AIElementExtractor:
     """
     指示ファイルとURLから要素を抽出するクラス
@@ -44,7 +138,7 @@ class AIElementExtractor:
         Args:
             keep_browser_open (bool): ブラウザを継続して使用するかどうか
             use_cookies (bool): Cookieを使用してログイン状態を維持するかどうか
-            headless (bool): ヘッドレスモードで実行するかどうか
+            headless (bool): ヘッドレスモードで実行するかどうか（Noneの場合はsettings.iniから読み込む）
         """
         # 環境変数を確実に読み込む
         env.load_env()
@@ -57,6 +151,8 @@ class AIElementExtractor:
         else:
             logger.error("OpenAI APIキーが設定されていません")
             raise ValueError("OpenAI APIキーが必要です")
+        # OpenAIクライアント（最初のAPI呼び出し時に作成する）
+        self._openai_client = None
         
         # 指示ファイルのパス
         self.direction_file = env.resolve_path("docs/ai_selenium_direction.md")
@@ -84,6 +180,9 @@ class AIElementExtractor:
             os.makedirs(self.cookies_dir, exist_ok=True)
             logger.info(f"Cookie保存ディレクトリを作成しました: {self.cookies_dir}")
         
+        # 要素抽出結果のキャッシュディレクトリ（同じ指示・同じHTMLではOpenAI APIを呼び出さない。初回の保存時に作成する）
+        self.extraction_cache_dir = os.path.join(env.get_project_root(), "data", "extraction_cache")
+        
         # 設定
         self.keep_browser_open = keep_browser_open
         self.use_cookies = use_cookies
@@ -136,9 +235,7 @@ class AIElementExtractor:
             return section_dict
             
         except Exception as e:
-            logger.error(f"指示ファイルの解析中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"指示ファイルの解析中にエラーが発生しました: {str(e)}")
             return {}
     
     def _parse_section_content(self, content):
@@ -208,7 +305,7 @@ class AIElementExtractor:
             # 操作手順の解析（数字. で始まる行）
             if current_section == '操作手順' and not line.startswith('##') and not line.startswith('--'):
                 # 番号付きリストの形式（例: 1. クリック）を解析
-                operation_match = re.match(r'^\d+\.\s+(.+)$', line)
+                operation_match = _NUMBERED_OPERATION_RE.match(line)
                 if operation_match:
                     operation = operation_match.group(1).strip()
                     result['operations'].append(operation)
@@ -264,17 +361,17 @@ class AIElementExtractor:
             return html_content, soup, filepath
             
         except Exception as e:
-            logger.error(f"ページ内容の取得中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"ページ内容の取得中にエラーが発生しました: {str(e)}")
             return "", None, ""
     
-    def get_page_content_with_selenium(self, url):
+    def get_page_content_with_selenium(self, url, reload=True):
         """
         URLのページ内容をSeleniumで取得する（JavaScriptレンダリング後）
         
         Args:
             url (str): 解析するURL
+            reload (bool, optional): すでに同じURLにいる場合にリロードするかどうか。
+                Falseの場合は表示中のページをそのまま使用する
             
         Returns:
             str: ページのHTML
@@ -291,8 +388,10 @@ class AIElementExtractor:
             # 現在のURLを取得
             current_url = self.browser.driver.current_url
             
-            # 同じURLの場合はページ遷移をスキップ（リロードする）
-            if current_url == url:
+            # 同じURLの場合はページ遷移をスキップ（reload指定時のみリロードする）
+            if current_url == url and not reload:
+                logger.info(f"すでに同じURL ({url}) にいるため、表示中のページを使用します")
+            elif current_url == url:
                 logger.info(f"すでに同じURL ({url}) にいるため、ページをリロードします")
                 self.browser.driver.refresh()
             else:
@@ -302,7 +401,7 @@ class AIElementExtractor:
             
             # ページ読み込み完了を待機
             try:
-                WebDriverWait(self.browser.driver, 10).until(
+                self.browser.get_wait(10).until(
                     lambda driver: driver.execute_script("return document.readyState") == "complete"
                 )
                 logger.info("ページ読み込みが完了しました")
@@ -327,9 +426,7 @@ class AIElementExtractor:
             return html_content, soup, filepath
             
         except Exception as e:
-            logger.error(f"Seleniumでのページ内容取得中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Seleniumでのページ内容取得中にエラーが発生しました: {str(e)}")
             return "", None, ""
     
     def _save_html_to_file(self, url, html_content):
@@ -345,10 +442,9 @@ class AIElementExtractor:
         """
         try:
             # URLからファイル名を生成
-            from urllib.parse import urlparse
             parsed_url = urlparse(url)
-            domain = parsed_url.netloc.replace('.', '_')
-            path = parsed_url.path.replace('/', '_').replace('.', '_')
+            domain = parsed_url.netloc.translate(_FILENAME_TRANSLATION)
+            path = parsed_url.path.translate(_FILENAME_TRANSLATION)
             if not path:
                 path = 'index'
             
@@ -363,12 +459,10 @@ class AIElementExtractor:
             return filepath
             
         except Exception as e:
-            logger.error(f"HTMLファイルの保存中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"HTMLファイルの保存中にエラーが発生しました: {str(e)}")
             return ""
     
-    def extract_elements_with_openai(self, direction, html_content, filepath):
+    def extract_elements_with_openai(self, direction, html_content, filepath, use_cache=True):
         """
         OpenAI APIを使用して要素を抽出する
         
@@ -376,28 +470,14 @@ class AIElementExtractor:
             direction (dict): 指示内容
             html_content (str): ページのHTML
             filepath (str): 保存されたHTMLファイルのパス
+            use_cache (bool, optional): 以前の抽出結果を再利用するかどうか（Falseの場合はAPIで抽出し直してキャッシュを更新する）
             
         Returns:
             dict: 抽出された要素情報
         """
         logger.info("OpenAI APIを使用して要素を抽出します")
         
-        # システムプロンプト
-        system_prompt = """
-あなたはウェブページ解析の専門家です。ユーザーから提供されたHTML要素を分析して、
-要素情報を抽出してください。
-
-以下の情報を各要素に対して特定してください：
-1. 要素のタイプ（入力フィールド、ボタン、リンクなど）
-2. 最適なセレクタ（ID、name、CSS、XPathの順で優先度が高い）
-3. 要素の属性情報（name, placeholder, valueなど）
-4. 表示テキスト（該当する場合）
-5. Seleniumで要素を操作するための最適な方法
-
-応答は必ずJSON形式で返してください。各要素の情報を含む配列として構造化してください。
-"""
-
-        # ユーザープロンプト
+        # ユーザープロンプト（ページごとに変わる内容のみ。HTML内容が長い場合に備えて先頭50000文字に制限）
         user_prompt = f"""
 # 指示内容
 タイトル: {direction.get('title', '')}
@@ -411,58 +491,38 @@ HTMLファイルは {filepath} に保存されています。
 
 # HTMLコンテンツ（一部）
 ```html
-{html_content[:50000]}  # HTML内容が長い場合に備えて制限
-```
-
-# 必要な出力
-上記の指示内容とHTMLコンテンツに基づいて、各要素の情報を抽出してJSON形式で返してください。
-各要素について以下の情報を含めてください：
-1. element_name: 要素の名前（指示内容の要素リストに対応）
-2. element_type: 要素の種類（input, button, link, select など）
-3. selectors: 要素を特定するためのセレクタ（複数の方法）
-   - id: ID属性によるセレクタ（存在する場合）
-   - name: name属性によるセレクタ（存在する場合）
-   - css: CSSセレクタ（最も具体的で一意なもの）
-   - xpath: XPath（最も具体的で一意なもの）
-4. attributes: 要素の主要な属性（type, placeholder, valueなど）
-5. visible_text: 表示テキスト（ボタンやリンクの場合）
-6. recommendations: Seleniumでの操作方法の推奨事項
-
-レスポンスは必ず以下のようなJSON形式にしてください:
-```json
-{{
-  "elements": [
-    {{
-      "element_name": "アカウントID入力フィールド",
-      "element_type": "input",
-      "selectors": {{
-        "id": "account_key",
-        "name": "account_key",
-        "css": "#account_key",
-        "xpath": "//input[@id='account_key']"
-      }},
-      "attributes": {{
-        "type": "text",
-        "placeholder": "アカウントID"
-      }},
-      "visible_text": "",
-      "recommendations": "WebDriverWait と presence_of_element_located を使用し、テキストを送信する"
-    }},
-    ...
-  ]
-}}
+{html_content[:50000]}
 ```
 """
 
+        # 指示内容・HTML・プロンプトが同じであれば、以前の抽出結果を使う
+        # （HTMLの保存先パスは毎回変わるためキーに含めない）
+        cache_key = hashlib.sha256("\0".join([
+            _EXTRACTION_MODEL,
+            _EXTRACTION_SYSTEM_PROMPT,
+            json.dumps(direction, ensure_ascii=False, sort_keys=True),
+            html_content[:50000],
+        ]).encode("utf-8")).hexdigest()
+        cache_path = os.path.join(self.extraction_cache_dir, f"{cache_key}.json")
+        if use_cache and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    extracted_elements = json.load(f)
+                logger.info(f"同じ内容のページの抽出結果を再利用します: {cache_path}")
+                return extracted_elements
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"抽出結果のキャッシュを読み込めませんでした: {str(e)}")
+        
         try:
-            # OpenAI APIを呼び出す
-            import openai
-            client = openai.OpenAI(api_key=self.openai_api_key)
+            # OpenAI APIを呼び出す（クライアントは初回に作成して使い回す）
+            if self._openai_client is None:
+                import openai
+                self._openai_client = openai.OpenAI(api_key=self.openai_api_key)
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = self._openai_client.chat.completions.create(
+                model=_EXTRACTION_MODEL,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": _EXTRACTION_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.2,
@@ -470,6 +530,13 @@ HTMLファイルは {filepath} に保存されています。
                 response_format={"type": "json_object"}
             )
             
+            # プロンプトキャッシュの利用状況を記録
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                details = getattr(usage, "prompt_tokens_details", None)
+                cached_tokens = getattr(details, "cached_tokens", 0) or 0
+                logger.info(f"入力トークン数: {usage.prompt_tokens}（うちキャッシュ済み: {cached_tokens}）")
+            
             # 生成された応答
             response_content = response.choices[0].message.content
             
@@ -477,6 +544,15 @@ HTMLファイルは {filepath} に保存されています。
             try:
                 extracted_elements = json.loads(response_content)
                 logger.info(f"要素の抽出に成功しました: {len(extracted_elements.get('elements', []))} 個の要素が見つかりました")
+                
+                # 要素が見つかった結果のみキャッシュする（保存に失敗しても抽出結果は返す）
+                if extracted_elements.get('elements'):
+                    try:
+                        os.makedirs(self.extraction_cache_dir, exist_ok=True)
+                        with open(cache_path, 'w', encoding='utf-8') as f:
+                            json.dump(extracted_elements, f, ensure_ascii=False, indent=2)
+                    except OSError as e:
+                        logger.warning(f"抽出結果をキャッシュに保存できませんでした: {str(e)}")
                 return extracted_elements
             except json.JSONDecodeError as e:
                 logger.error(f"OpenAI応答のJSON解析に失敗しました: {str(e)}")
@@ -484,9 +560,7 @@ HTMLファイルは {filepath} に保存されています。
                 return {"elements": []}
             
         except Exception as e:
-            logger.error(f"OpenAI APIによる要素抽出中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"OpenAI APIによる要素抽出中にエラーが発生しました: {str(e)}")
             return {"elements": []}
     
     def log_extracted_elements(self, extracted_elements):
@@ -561,14 +635,13 @@ HTMLファイルは {filepath} に保存されています。
                 self.browser.save_screenshot(screenshot_path)
                 
                 # 操作タイプを判定
-                if "クリック" in operation.lower():
-                    self._perform_click_operation(operation)
-                elif "入力" in operation.lower():
-                    self._perform_input_operation(operation)
-                elif "選択" in operation.lower():
-                    self._perform_select_operation(operation)
-                elif "待機" in operation.lower():
-                    self._perform_wait_operation(operation)
+                operation_lower = operation.lower()
+                handler_name = next(
+                    (name for keyword, name in _OPERATION_HANDLERS if keyword in operation_lower),
+                    None
+                )
+                if handler_name:
+                    getattr(self, handler_name)(operation)
                 else:
                     logger.warning(f"未対応の操作です: {operation}")
                 
@@ -583,9 +656,7 @@ HTMLファイルは {filepath} に保存されています。
             return True
             
         except Exception as e:
-            logger.error(f"操作の実行中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"操作の実行中にエラーが発生しました: {str(e)}")
             
             # エラー時のスクリーンショット
             self.browser.save_screenshot("operation_error.png")
@@ -605,61 +676,47 @@ HTMLファイルは {filepath} に保存されています。
             element_name = element_name.split("を")[0].strip()
             
         logger.info(f"'{element_name}' 要素をクリックします")
-        
+
+        # contains(., ...) は子孫要素（spanなど）のテキストもまとめて1回で照合する
+        xpath = (
+            f"//button[contains(., '{element_name}')] | "
+            f"//a[contains(., '{element_name}')] | "
+            f"//*[contains(@title, '{element_name}')] | "
+            f"//*[contains(@aria-label, '{element_name}')] | "
+            f"//*[contains(@alt, '{element_name}')]"
+        )
+
+        # 様々な方法で要素を検索（待機とクリックを1回のwait_and_clickで行う）
+        locators = [
+            # リンクテキスト
+            (By.LINK_TEXT, element_name),
+            # 部分一致リンクテキスト
+            (By.PARTIAL_LINK_TEXT, element_name),
+            # XPathで要素を検索
+            (By.XPATH, xpath),
+            # CSSセレクタで要素を検索
+            (By.CSS_SELECTOR,
+             f"[title*='{element_name}'], [aria-label*='{element_name}'], [alt*='{element_name}']"),
+        ]
+
+        for by, value in locators:
+            if self.browser.wait_and_click(by, value, timeout=10):
+                logger.info(f"'{element_name}' 要素のクリックに成功しました")
+                return
+
+        logger.error(f"'{element_name}' 要素のクリックに失敗しました")
+        # JavaScriptでのクリックを試みる
         try:
-            # テキストで要素を検索
-            wait = WebDriverWait(self.browser.driver, 10)
+            logger.info(f"JavaScriptを使用して '{element_name}' 要素のクリックを試みます")
+            elements = self.browser.driver.find_elements(By.XPATH, xpath)
             
-            # 様々な方法で要素を検索
-            try:
-                # リンクテキスト
-                element = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, element_name)))
-            except:
-                try:
-                    # 部分一致リンクテキスト
-                    element = wait.until(EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, element_name)))
-                except:
-                    try:
-                        # XPathで要素を検索
-                        element = wait.until(EC.element_to_be_clickable((
-                            By.XPATH, 
-                            f"//button[contains(text(), '{element_name}')] | "
-                            f"//a[contains(text(), '{element_name}')] | "
-                            f"//*[contains(@title, '{element_name}')] | "
-                            f"//*[contains(@aria-label, '{element_name}')] | "
-                            f"//*[contains(@alt, '{element_name}')]"
-                        )))
-                    except:
-                        # CSSセレクタで要素を検索
-                        element = wait.until(EC.element_to_be_clickable((
-                            By.CSS_SELECTOR, 
-                            f"[title*='{element_name}'], [aria-label*='{element_name}'], [alt*='{element_name}']"
-                        )))
-            
-            # 要素が見つかったらクリック
-            element.click()
-            logger.info(f"'{element_name}' 要素のクリックに成功しました")
-            
-        except Exception as e:
-            logger.error(f"'{element_name}' 要素のクリックに失敗しました: {str(e)}")
-            # JavaScriptでのクリックを試みる
-            try:
-                logger.info(f"JavaScriptを使用して '{element_name}' 要素のクリックを試みます")
-                elements = self.browser.driver.find_elements(By.XPATH, 
-                    f"//button[contains(text(), '{element_name}')] | "
-                    f"//a[contains(text(), '{element_name}')] | "
-                    f"//*[contains(@title, '{element_name}')] | "
-                    f"//*[contains(@aria-label, '{element_name}')] | "
-                    f"//*[contains(@alt, '{element_name}')]"
-                )
-                
-                if elements:
-                    self.browser.driver.execute_script("arguments[0].click();", elements[0])
-                    logger.info(f"JavaScriptによる '{element_name}' 要素のクリックに成功しました")
-                else:
-                    logger.error(f"'{element_name}' 要素が見つかりませんでした")
-            except Exception as js_e:
-                logger.error(f"JavaScriptによる '{element_name}' 要素のクリックにも失敗しました: {str(js_e)}")
+            if elements:
+                self.browser.driver.execute_script("arguments[0].click();", elements[0])
+                logger.info(f"JavaScriptによる '{element_name}' 要素のクリックに成功しました")
+            else:
+                logger.error(f"'{element_name}' 要素が見つかりませんでした")
+        except Exception as js_e:
+            logger.error(f"JavaScriptによる '{element_name}' 要素のクリックにも失敗しました: {str(js_e)}")
     
     def _perform_input_operation(self, operation):
         """
@@ -678,7 +735,7 @@ HTMLファイルは {filepath} に保存されています。
         input_value_part = parts[1].strip()
         
         # 入力値を「」または""から抽出
-        input_value_match = re.search(r'[「""](.*?)[」""]', input_value_part)
+        input_value_match = _QUOTED_VALUE_RE.search(input_value_part)
         if not input_value_match:
             logger.error(f"入力値が見つかりません: {operation}")
             return
@@ -687,32 +744,27 @@ HTMLファイルは {filepath} に保存されています。
         logger.info(f"'{element_name}' 要素に '{input_value}' を入力します")
         
         try:
-            # 様々な方法で要素を検索
-            wait = WebDriverWait(self.browser.driver, 10)
-            try:
+            # 様々な方法で要素を検索（いずれかの方法で見つかった時点で待機を終える）
+            element = self.browser.get_wait(10).until(EC.any_of(
                 # name属性
-                element = wait.until(EC.presence_of_element_located((By.NAME, element_name)))
-            except:
-                try:
-                    # id属性
-                    element = wait.until(EC.presence_of_element_located((By.ID, element_name)))
-                except:
-                    try:
-                        # placeholder属性
-                        element = wait.until(EC.presence_of_element_located((
-                            By.XPATH, 
-                            f"//input[@placeholder='{element_name}' or contains(@placeholder, '{element_name}')] | "
-                            f"//textarea[@placeholder='{element_name}' or contains(@placeholder, '{element_name}')]"
-                        )))
-                    except:
-                        # ラベルテキスト
-                        element = wait.until(EC.presence_of_element_located((
-                            By.XPATH, 
-                            f"//label[text()='{element_name}' or contains(text(), '{element_name}')]"
-                                f"/following::input[1] | "
-                            f"//label[text()='{element_name}' or contains(text(), '{element_name}')]"
-                                f"/following::textarea[1]"
-                        )))
+                EC.presence_of_element_located((By.NAME, element_name)),
+                # id属性
+                EC.presence_of_element_located((By.ID, element_name)),
+                # placeholder属性
+                EC.presence_of_element_located((
+                    By.XPATH, 
+                    f"//input[contains(@placeholder, '{element_name}')] | "
+                    f"//textarea[contains(@placeholder, '{element_name}')]"
+                )),
+                # ラベルテキスト
+                EC.presence_of_element_located((
+                    By.XPATH, 
+                    f"//label[contains(., '{element_name}')]"
+                        f"/following::input[1] | "
+                    f"//label[contains(., '{element_name}')]"
+                        f"/following::textarea[1]"
+                )),
+            ))
             
             # 要素が見つかったら入力
             element.clear()
@@ -739,7 +791,7 @@ HTMLファイルは {filepath} に保存されています。
         select_value_part = parts[1].strip()
         
         # 選択値を「」または""から抽出
-        select_value_match = re.search(r'[「""](.*?)[」""]', select_value_part)
+        select_value_match = _QUOTED_VALUE_RE.search(select_value_part)
         if not select_value_match:
             logger.error(f"選択値が見つかりません: {operation}")
             return
@@ -748,31 +800,24 @@ HTMLファイルは {filepath} に保存されています。
         logger.info(f"'{element_name}' 要素から '{select_value}' を選択します")
         
         try:
-            from selenium.webdriver.support.ui import Select
-            
-            # 様々な方法で要素を検索
-            wait = WebDriverWait(self.browser.driver, 10)
+            # 様々な方法で要素を検索（いずれかの方法で見つかった時点で待機を終える）
             try:
-                # name属性
-                element = wait.until(EC.presence_of_element_located((By.NAME, element_name)))
+                element = self.browser.get_wait(10).until(EC.any_of(
+                    # name属性
+                    EC.presence_of_element_located((By.NAME, element_name)),
+                    # id属性
+                    EC.presence_of_element_located((By.ID, element_name)),
+                    # ラベルテキスト
+                    EC.presence_of_element_located((
+                        By.XPATH, 
+                        f"//label[contains(., '{element_name}')]"
+                            f"/following::select[1]"
+                    )),
+                ))
                 select = Select(element)
             except:
-                try:
-                    # id属性
-                    element = wait.until(EC.presence_of_element_located((By.ID, element_name)))
-                    select = Select(element)
-                except:
-                    try:
-                        # ラベルテキスト
-                        element = wait.until(EC.presence_of_element_located((
-                            By.XPATH, 
-                            f"//label[text()='{element_name}' or contains(text(), '{element_name}')]"
-                                f"/following::select[1]"
-                        )))
-                        select = Select(element)
-                    except:
-                        logger.error(f"'{element_name}' の選択要素が見つかりません")
-                        return
+                logger.error(f"'{element_name}' の選択要素が見つかりません")
+                return
             
             # 可視テキストで選択を試みる
             try:
@@ -812,7 +857,7 @@ HTMLファイルは {filepath} に保存されています。
             operation (str): 操作内容（例: "5秒待機"）
         """
         # 待機時間を抽出
-        wait_match = re.search(r'(\d+)\s*秒', operation)
+        wait_match = _WAIT_SECONDS_RE.search(operation)
         if not wait_match:
             logger.warning(f"待機時間が指定されていません。デフォルトの3秒を使用します: {operation}")
             wait_seconds = 3
@@ -856,7 +901,6 @@ HTMLファイルは {filepath} に保存されています。
             # ドメインが指定されていない場合は現在のURLからドメインを取得
             if not domain:
                 current_url = self.browser.get_current_url()
-                from urllib.parse import urlparse
                 domain = urlparse(current_url).netloc
                 
             # Cookieを取得
@@ -875,9 +919,7 @@ HTMLファイルは {filepath} に保存されています。
             return True
             
         except Exception as e:
-            logger.error(f"Cookieの保存中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Cookieの保存中にエラーが発生しました: {str(e)}")
             return False
     
     def load_cookies(self, domain):
@@ -966,9 +1008,7 @@ HTMLファイルは {filepath} に保存されています。
                 return False
                 
         except Exception as e:
-            logger.error(f"Cookieのロード中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Cookieのロード中にエラーが発生しました: {str(e)}")
             return False
             
     def _prepare_cookie_for_domain(self, cookie, target_domain):
@@ -1094,60 +1134,51 @@ HTMLファイルは {filepath} に保存されています。
             logger.info(f"ログイン状態をチェックします: {dashboard_url}")
             self.browser.navigate_to(dashboard_url)
             
-            # ページの読み込みを待機（十分な時間）
-            time.sleep(5)
+            # ログインページへのリダイレクトかダッシュボードの表示を待機（最大5秒、判定できた時点で進む）
+            # （待機中はURLとブラウザ内のXPath評価だけで判定し、ページソースは取得しない）
+            try:
+                self.browser.get_wait(5).until(EC.any_of(
+                    EC.url_contains(login_url),
+                    EC.url_contains('id.ebis.ne.jp'),
+                    EC.presence_of_element_located((By.XPATH, _DASHBOARD_MARKERS_XPATH))
+                ))
+            except TimeoutException:
+                pass
             
             # 現在のURLを取得
             current_url = self.browser.get_current_url()
             logger.info(f"現在のURL: {current_url}")
             
-            # HTMLソースを取得して特定の要素や特徴をチェック
-            page_source = self.browser.driver.page_source
-            
-            # ログイン判定方法1: URLベースのチェック
+            # ログイン判定方法1: URLベースのチェック（ページソースを取得せずに判定できるものを先に行う）
             if login_url in current_url:
                 logger.info("URLベースのチェック: ログインページにリダイレクトされました（未ログイン状態）")
                 return False
+            if 'id.ebis.ne.jp' in current_url:
+                logger.info("URLベースのチェック: id.ebis.ne.jpドメインが現在のURLに含まれています（未ログイン状態）")
+                return False
+            
+            # HTMLソースを取得して特定の要素や特徴をチェック
+            page_source = self.browser.driver.page_source
                 
             # ログイン判定方法2: ダッシュボードURLが含まれているかチェック
-            dashboard_domain = dashboard_url.replace("https://", "").replace("http://", "").split("/")[0]
+            dashboard_domain = urlparse(dashboard_url).netloc
             if dashboard_domain in current_url:
                 logger.info("URLベースのチェック: ダッシュボードドメインが現在のURLに含まれています（ログイン済み状態）")
                 
                 # ログイン判定方法3: 特定のダッシュボード要素が存在するかチェック
-                dashboard_elements = [
-                    'ダッシュボード',
-                    'ログアウト',
-                    'マイアカウント',
-                    'bishamon-header',
-                    'account-menu'
-                ]
-                
-                for element in dashboard_elements:
-                    if element in page_source:
-                        logger.info(f"要素ベースのチェック: ダッシュボード要素 '{element}' が見つかりました（ログイン済み状態）")
-                        return True
+                match = _DASHBOARD_MARKERS_RE.search(page_source)
+                if match:
+                    logger.info(f"要素ベースのチェック: ダッシュボード要素 '{match.group(0)}' が見つかりました（ログイン済み状態）")
+                    return True
             
             # ログイン判定方法4: ログイン特有の要素をチェック
-            login_elements = [
-                'loginForm',
-                'ログインする',
-                'ログインページ',
-                'ユーザー名',
-                'パスワード',
-                'アカウントキー'
-            ]
-            
-            for element in login_elements:
-                if element in page_source:
-                    logger.info(f"要素ベースのチェック: ログイン要素 '{element}' が見つかりました（未ログイン状態）")
-                    return False
+            match = _LOGIN_MARKERS_RE.search(page_source)
+            if match:
+                logger.info(f"要素ベースのチェック: ログイン要素 '{match.group(0)}' が見つかりました（未ログイン状態）")
+                return False
             
             # 判定できない場合は、URLに基づいて判断
-            if 'id.ebis.ne.jp' in current_url:
-                logger.info("URLベースのチェック（最終判断）: id.ebis.ne.jpドメインが現在のURLに含まれています（未ログイン状態）")
-                return False
-            elif 'bishamon.ebis.ne.jp' in current_url:
+            if 'bishamon.ebis.ne.jp' in current_url:
                 logger.info("URLベースのチェック（最終判断）: bishamon.ebis.ne.jpドメインが現在のURLに含まれています（ログイン済み状態）")
                 return True
             
@@ -1156,9 +1187,7 @@ HTMLファイルは {filepath} に保存されています。
             return login_url not in current_url
             
         except Exception as e:
-            logger.error(f"ログイン状態のチェック中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"ログイン状態のチェック中にエラーが発生しました: {str(e)}")
             return False
     
     def prepare_browser(self):
@@ -1185,9 +1214,7 @@ HTMLファイルは {filepath} に保存されています。
             return True
             
         except Exception as e:
-            logger.error(f"ブラウザの準備中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"ブラウザの準備中にエラーが発生しました: {str(e)}")
             return False
     
     def execute_login_if_needed(self, login_section="login", dashboard_url=None, force_login=False, clear_cookies=False):
@@ -1237,9 +1264,7 @@ HTMLファイルは {filepath} に保存されています。
                 return True
             
         except Exception as e:
-            logger.error(f"ログイン処理中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"ログイン処理中にエラーが発生しました: {str(e)}")
             return False
     
     def save_elements_to_file(self, section_name, elements):
@@ -1254,9 +1279,6 @@ HTMLファイルは {filepath} に保存されています。
             str: 保存されたファイルパス、失敗した場合は空文字
         """
         try:
-            import json
-            import os
-            
             # elements_dirの作成
             try:
                 elements_dir = env.resolve_path("data/elements")
@@ -1309,12 +1331,10 @@ HTMLファイルは {filepath} に保存されています。
             return filepath
             
         except Exception as e:
-            logger.error(f"要素情報の保存中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"要素情報の保存中にエラーが発生しました: {str(e)}")
             return ""
     
-    def execute_extraction(self, section_name, save_cookies=False, keep_browser_open=None):
+    def execute_extraction(self, section_name, save_cookies=False, keep_browser_open=None, use_cache=True):
         """
         指示ファイルの解析から要素抽出までを行う
         
@@ -1322,6 +1342,7 @@ HTMLファイルは {filepath} に保存されています。
             section_name (str): セクション名
             save_cookies (bool, optional): 実行後にCookieを保存するかどうか
             keep_browser_open (bool, optional): ブラウザを開いたままにするかどうか（指定しない場合はインスタンス変数を使用）
+            use_cache (bool, optional): 同じ内容のページの以前の抽出結果を再利用するかどうか
             
         Returns:
             bool: 成功した場合はTrue、失敗した場合はFalse
@@ -1348,6 +1369,7 @@ HTMLファイルは {filepath} に保存されています。
                 
             # ログイン済み状態で分析系セクションの場合は、現在のURLが優先
             # セクション名が'detail_analytics'で始まり、ログイン済みの場合
+            reload_page = True
             if section_name == 'detail_analytics' and is_already_logged_in:
                 dashboard_url = env.get_config_value("Credentials", "url_dashboard", "https://bishamon.ebis.ne.jp/dashboard")
                 current_url = self.browser.driver.current_url
@@ -1355,6 +1377,8 @@ HTMLファイルは {filepath} に保存されています。
                 if dashboard_url and dashboard_url in current_url:
                     logger.info(f"ログイン済み状態のため、現在のURL（{current_url}）を使用します")
                     url = current_url
+                    # ログイン処理で読み込み済みのページを再読み込みしない
+                    reload_page = False
                 else:
                     logger.info(f"ダッシュボードURLをセクションURLに設定します: {dashboard_url}")
                     url = dashboard_url
@@ -1395,7 +1419,7 @@ HTMLファイルは {filepath} に保存されています。
             
             # ページ内容を取得（Seleniumを使用）
             logger.info(f"ページ内容を取得します: {url}")
-            html_content, soup, filepath = self.get_page_content_with_selenium(url)
+            html_content, soup, filepath = self.get_page_content_with_selenium(url, reload=reload_page)
             if not html_content:
                 logger.error("ページ内容の取得に失敗しました")
                 return False
@@ -1418,7 +1442,9 @@ HTMLファイルは {filepath} に保存されています。
                 logger.info(f"操作後のHTMLファイルを保存しました: {filepath}")
             
             # OpenAI APIを使用して要素を抽出
-            extracted_elements = self.extract_elements_with_openai(direction, html_content, filepath)
+            extracted_elements = self.extract_elements_with_openai(
+                direction, html_content, filepath, use_cache=use_cache
+            )
             if not extracted_elements:
                 logger.error("要素の抽出に失敗しました")
                 return False
@@ -1433,7 +1459,6 @@ HTMLファイルは {filepath} に保存されています。
             
             # Cookieを保存（オプション - 非推奨）
             if save_cookies:
-                from urllib.parse import urlparse
                 domain = urlparse(url).netloc
                 self.save_cookies(domain)
             
@@ -1442,9 +1467,7 @@ HTMLファイルは {filepath} に保存されています。
             return True
             
         except Exception as e:
-            logger.error(f"要素抽出中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"要素抽出中にエラーが発生しました: {str(e)}")
             return False
         
         finally:
@@ -1466,12 +1489,14 @@ def parse_arguments():
     parser.add_argument('--keep-browser', action='store_true', help='ブラウザを終了せずに保持する')
     parser.add_argument('--section', type=str, default='login', help='操作セクション名（例: login）')
     parser.add_argument('--save-cookies', action='store_true', help='実行後にCookieを保存する')
-    parser.add_argument('--headless', action='store_true', help='ヘッドレスモードで実行する')
+    parser.add_argument('--headless', action=argparse.BooleanOptionalAction, default=None,
+                        help='ヘッドレスモードで実行する（--no-headless で画面表示、未指定の場合はsettings.iniに従う）')
     parser.add_argument('--auto-login', action='store_true', help='自動的にログイン処理を行う')
     parser.add_argument('--use-cookies', action='store_true', help='保存済みのCookieを使用する')
     parser.add_argument('--clear-cookies', action='store_true', help='既存のCookieをクリアする')
     parser.add_argument('--force-login', action='store_true', help='強制的にログイン処理を行う')
     parser.add_argument('--dashboard-url', type=str, help='ダッシュボードURL（ログイン確認用）')
+    parser.add_argument('--no-cache', action='store_true', help='以前の抽出結果を使わず、OpenAI APIで抽出し直す')
     
     return parser.parse_args()
 
@@ -1518,7 +1543,8 @@ def main():
         success = extractor.execute_extraction(
             section_name=args.section,
             save_cookies=args.save_cookies,
-            keep_browser_open=args.keep_browser
+            keep_browser_open=args.keep_browser,
+            use_cache=not args.no_cache
         )
         
         if not success:
@@ -1533,9 +1559,7 @@ def main():
         return 1
         
     except Exception as e:
-        logger.error(f"予期しないエラーが発生しました: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"予期しないエラーが発生しました: {str(e)}")
         return 1
         
     finally:
@@ -1,20 +1,17 @@
 import os
 import csv
 import time
-import traceback
+import itertools
 import configparser
 from pathlib import Path
 from datetime import datetime
-from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import subprocess
-import re
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
+)
 
 from src.utils.logging_config import get_logger
 from src.utils.environment import EnvironmentUtils as env
@@ -22,6 +19,86 @@ from src.utils.slack_notifier import SlackNotifier
 
 logger = get_logger(__name__)
 
+# selectors.csv のselector_type と By の対応
+_SELECTOR_TYPE_TO_BY = {
+    'css': By.CSS_SELECTOR,
+    'xpath': By.XPATH,
+    'id': By.ID,
+    'name': By.NAME,
+    'class': By.CLASS_NAME,
+}
+
+def _as_bool(value, default=False):
+    """
+    設定値をブール値に変換する
+    
+    Args:
+        value: 設定値（"true"/"false" の文字列、またはブール値）
+        default (bool): 値がNoneの場合に返す値
+        
+    Returns:
+        bool: 変換後の値
+    """
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+# エラー時のスクリーンショットの連番（同じ秒に複数のエラーが起きてもファイル名が重複しないようにする）
+_ERROR_SCREENSHOT_COUNTER = itertools.count(1)
+
+# ログインフォームのフォールバックセレクタ（CSVに定義がない場合のみ使用）
+_FALLBACK_LOGIN_SELECTORS = (
+    ('username', {
+        'selector_type': 'xpath',
+        'selector_value': '//input[@name="username" or @id="username" or contains(@class, "username")]'
+    }),
+    ('password', {
+        'selector_type': 'xpath',
+        'selector_value': '//input[@name="password" or @id="password" or @type="password"]'
+    }),
+    ('submit', {
+        'selector_type': 'xpath',
+        'selector_value': '//button[@type="submit" or contains(@class, "submit") or contains(@class, "login")]'
+    }),
+)
+
+# 解析済みのセレクタファイル（(絶対パス, 更新時刻) -> {group: {name: セレクタ情報}}）
+_SELECTORS_CACHE = {}
+
+def _parse_selectors_csv(selectors_path):
+    """
+    セレクタ情報のCSVファイルを解析する
+    
+    Args:
+        selectors_path (str): セレクタ情報を含むCSVファイルのパス
+        
+    Returns:
+        dict: {group: {name: {'selector_type': ..., 'selector_value': ...}}} 形式の辞書
+    """
+    selectors = {}
+    with open(selectors_path, 'r', encoding='utf-8', newline='') as f:
+        # 行ごとに辞書を作らず、ヘッダーから求めた列番号で必要な列だけを取り出す
+        reader = csv.reader(f)
+        header = next(reader, None)
+        try:
+            i_group, i_name, i_type, i_value = (
+                header.index(column) for column in ('group', 'name', 'selector_type', 'selector_value')
+            )
+        except (AttributeError, ValueError):
+            # ヘッダーがない、または必要な列が揃っていない
+            return selectors
+        min_length = max(i_group, i_name, i_type, i_value) + 1
+        for row in reader:
+            if len(row) < min_length:
+                continue
+            selectors.setdefault(row[i_group], {})[row[i_name]] = {
+                'selector_type': row[i_type],
+                'selector_value': row[i_value]
+            }
+    return selectors
+
 class Browser:
     """
     ブラウザ操作を管理するクラス
@@ -43,10 +120,14 @@ class Browser:
         """
         self.driver = None
         self.wait = None
+        self._waits = {}
         self.timeout = timeout
         
+        # BROWSERセクションの設定をまとめて読み込む
+        self._browser_settings = self._load_browser_settings()
+        
         # Slack通知用のインスタンスを初期化
-        self.slack = SlackNotifier()
+        self.slack = SlackNotifier.get_instance()
         
         # settings.iniからheadlessモードの設定を読み込む（引数で指定がなければ）
         if headless is None:
@@ -56,12 +137,14 @@ class Browser:
             
         self.selectors_path = selectors_path
         self.selectors = {}
+        # (group, name) -> (By, selector_value) の解決済みロケータ
+        self._locator_cache = {}
         
         # スクリーンショット設定を読み込む
-        self.auto_screenshot = self._get_screenshot_setting("auto_screenshot", default=True)
+        self.auto_screenshot = _as_bool(self._get_screenshot_setting("auto_screenshot", default=True), default=True)
         self.screenshot_format = self._get_screenshot_setting("screenshot_format", default="png")
         self.screenshot_quality = int(self._get_screenshot_setting("screenshot_quality", default="100"))
-        self.screenshot_on_error = self._get_screenshot_setting("screenshot_on_error", default=True)
+        self.screenshot_on_error = _as_bool(self._get_screenshot_setting("screenshot_on_error", default=True), default=True)
         
         # スクリーンショット保存ディレクトリ
         screenshot_dir_setting = self._get_screenshot_setting("screenshot_dir", default="logs/screenshots")
@@ -87,29 +170,26 @@ class Browser:
         
         # 基本的なフォールバックセレクタの例
         # 例: ログインフォームのフォールバックセレクタ
-        if 'login' not in self.selectors:
-            self.selectors['login'] = {}
-            
-        if 'username' not in self.selectors.get('login', {}):
-            self.selectors.setdefault('login', {})['username'] = {
-                'selector_type': 'xpath',
-                'selector_value': '//input[@name="username" or @id="username" or contains(@class, "username")]'
-            }
-            
-        if 'password' not in self.selectors.get('login', {}):
-            self.selectors.setdefault('login', {})['password'] = {
-                'selector_type': 'xpath',
-                'selector_value': '//input[@name="password" or @id="password" or @type="password"]'
-            }
-            
-        if 'submit' not in self.selectors.get('login', {}):
-            self.selectors.setdefault('login', {})['submit'] = {
-                'selector_type': 'xpath',
-                'selector_value': '//button[@type="submit" or contains(@class, "submit") or contains(@class, "login")]'
-            }
+        login_selectors = self.selectors.setdefault('login', {})
+        for name, selector_info in _FALLBACK_LOGIN_SELECTORS:
+            if name not in login_selectors:
+                login_selectors[name] = dict(selector_info)
             
         logger.debug(f"フォールバックセレクタを設定しました")
     
+    def _load_browser_settings(self):
+        """
+        settings.iniファイルからBROWSERセクションの設定をまとめて読み込む
+        
+        Returns:
+            dict: 設定名と値の辞書。読み込めない場合は空の辞書
+        """
+        try:
+            return env.get_config_section("BROWSER")
+        except Exception as e:
+            logger.warning(f"settings.iniからブラウザ設定を読み込めませんでした: {str(e)}")
+            return {}
+    
     def _get_headless_setting(self):
         """
         settings.iniファイルからheadlessモードの設定を読み込む
@@ -122,12 +202,10 @@ class Browser:
             app_env = env.get_environment()
             
             # BROWSER セクションからheadless設定を読み込む
-            headless = env.get_config_value("BROWSER", "headless", default="false")
+            headless = self._browser_settings.get("headless", "false")
             
             # 文字列をブール値に変換
-            if isinstance(headless, str):
-                return headless.lower() == "true"
-            return bool(headless)
+            return _as_bool(headless)
             
         except Exception as e:
             logger.warning(f"settings.iniからheadless設定を読み込めませんでした: {str(e)}")
@@ -261,15 +339,15 @@ class Browser:
             # WebDriverの初期化
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.driver.maximize_window()
-            self.wait = WebDriverWait(self.driver, self.timeout)
+            self._waits = {}
+            self.wait = self.get_wait()
             
             logger.info("✅ WebDriverのセットアップが完了しました")
             return True
             
         except Exception as e:
             error_message = "WebDriverのセットアップ中にエラーが発生しました"
-            logger.error(f"{error_message}: {str(e)}")
-            logger.error(traceback.format_exc())
+            # エラーの記録（スタックトレースを含む）は_notify_errorで行う
             self._notify_error(error_message, e, {"設定": f"headless={self.headless}, timeout={self.timeout}"})
             return False
     
@@ -282,21 +360,17 @@ class Browser:
         """
         try:
             logger.info(f"セレクタファイルを読み込みます: {self.selectors_path}")
+            self._locator_cache.clear()
             
-            with open(self.selectors_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if 'group' in row and 'name' in row and 'selector_type' in row and 'selector_value' in row:
-                        group = row['group']
-                        name = row['name']
-                        
-                        if group not in self.selectors:
-                            self.selectors[group] = {}
-                        
-                        self.selectors[group][name] = {
-                            'selector_type': row['selector_type'],
-                            'selector_value': row['selector_value']
-                        }
+            # 同じファイルが更新されていなければ解析済みの結果を使う
+            cache_key = (os.path.abspath(self.selectors_path), os.path.getmtime(self.selectors_path))
+            parsed = _SELECTORS_CACHE.get(cache_key)
+            if parsed is None:
+                parsed = _parse_selectors_csv(self.selectors_path)
+                _SELECTORS_CACHE[cache_key] = parsed
+            
+            for group, selectors in parsed.items():
+                self.selectors.setdefault(group, {}).update(selectors)
             
             logger.info(f"セレクタ情報を読み込みました: {len(self.selectors)} グループ")
             for group, selectors in self.selectors.items():
@@ -305,9 +379,7 @@ class Browser:
             return True
             
         except Exception as e:
-            logger.error(f"セレクタファイルの読み込み中にエラーが発生しました: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"セレクタファイルの読み込み中にエラーが発生しました: {str(e)}")
             return False
     
     def navigate_to(self, url):
@@ -345,7 +417,7 @@ class Browser:
             
             # ページが完全に読み込まれるまで待機
             try:
-                WebDriverWait(self.driver, 10).until(
+                self.get_wait(10).until(
                     lambda driver: driver.execute_script("return document.readyState") == "complete"
                 )
                 logger.info("ページ読み込みが完了しました")
@@ -355,10 +427,64 @@ class Browser:
             return True
             
         except Exception as e:
-            logger.error(f"URL移動中にエラーが発生しました: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"URL移動中にエラーが発生しました: {str(e)}")
             return False
     
+    def get_wait(self, timeout=None):
+        """
+        指定したタイムアウトのWebDriverWaitを取得する
+        
+        インスタンスはタイムアウトごとに使い回し、ポーリング間隔を0.1秒に短縮している
+        
+        Args:
+            timeout (int, optional): タイムアウト時間（秒）。未指定時はデフォルトのタイムアウトを使用
+            
+        Returns:
+            WebDriverWait: 待機オブジェクト
+        """
+        timeout = timeout or self.timeout
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = WebDriverWait(
+                self.driver,
+                timeout,
+                poll_frequency=0.1,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)
+            )
+            self._waits[timeout] = wait
+        return wait
+    
+    def locator(self, group, name):
+        """
+        セレクタ情報をWebDriverWaitにそのまま渡せるロケータに変換する
+        
+        変換結果はキャッシュされ、同じセレクタの2回目以降の呼び出しでは再解決しない
+        
+        Args:
+            group (str): セレクタのグループ名
+            name (str): セレクタの名前
+            
+        Returns:
+            tuple: (By, selector_value) のタプル。セレクタが見つからない場合はNone
+        """
+        key = (group, name)
+        cached = self._locator_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        selector_info = self.selectors.get(group, {}).get(name)
+        if selector_info is None:
+            logger.error(f"セレクタが見つかりません: {group}.{name}")
+            return None
+        
+        by = _SELECTOR_TYPE_TO_BY.get(selector_info['selector_type'].lower())
+        if by is None:
+            logger.error(f"未対応のセレクタタイプです: {selector_info['selector_type']}")
+            return None
+        
+        self._locator_cache[key] = (by, selector_info['selector_value'])
+        return self._locator_cache[key]
+    
     def get_element(self, group, name, wait_time=None):
         """
         指定されたセレクタに一致する要素を取得する
@@ -375,35 +501,15 @@ class Browser:
             logger.error("WebDriverが初期化されていません")
             return None
         
-        if group not in self.selectors or name not in self.selectors[group]:
-            logger.error(f"セレクタが見つかりません: {group}.{name}")
+        locator = self.locator(group, name)
+        if locator is None:
             return None
         
-        selector_info = self.selectors[group][name]
-        selector_type = selector_info['selector_type']
-        selector_value = selector_info['selector_value']
-        
         try:
-            wait = WebDriverWait(self.driver, wait_time or self.timeout)
-            
-            if selector_type.lower() == 'css':
-                element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector_value)))
-            elif selector_type.lower() == 'xpath':
-                element = wait.until(EC.presence_of_element_located((By.XPATH, selector_value)))
-            elif selector_type.lower() == 'id':
-                element = wait.until(EC.presence_of_element_located((By.ID, selector_value)))
-            elif selector_type.lower() == 'name':
-                element = wait.until(EC.presence_of_element_located((By.NAME, selector_value)))
-            elif selector_type.lower() == 'class':
-                element = wait.until(EC.presence_of_element_located((By.CLASS_NAME, selector_value)))
-            else:
-                logger.error(f"未対応のセレクタタイプです: {selector_type}")
-                return None
-            
-            return element
+            return self.get_wait(wait_time).until(EC.presence_of_element_located(locator))
             
         except TimeoutException:
-            logger.warning(f"要素が見つかりませんでした: {group}.{name} ({selector_type}: {selector_value})")
+            logger.warning(f"要素が見つかりませんでした: {group}.{name} ({locator[0]}: {locator[1]})")
             return None
         except Exception as e:
             logger.error(f"要素の取得中にエラーが発生しました: {str(e)}")
@@ -471,6 +577,8 @@ class Browser:
         }
         
         try:
+            # ページ解析を使わない処理ではbs4の読み込みを省くため、使用時にインポートする
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(html_content, 'html.parser')
             
             # タイトルを取得
@@ -563,7 +671,50 @@ class Browser:
                     logger.error(f"JavaScriptを使用した要素のクリックにも失敗しました: {str(js_e)}")
             
             return False
-    
+
+    def wait_and_click(self, by, value, timeout=None, use_javascript=False):
+        """
+        要素がクリック可能になるまで待機し、取得した要素をそのままクリックする
+
+        click_element と異なり、待機で得た要素を再検索せずに直接クリックするため、
+        WebDriverへのコマンド発行回数を抑えられる
+
+        Args:
+            by (By): 検索方法（By.CSS_SELECTOR, By.XPATHなど）
+            value (str): セレクタの値
+            timeout (int, optional): タイムアウト時間（秒）。未指定時はデフォルトのタイムアウトを使用
+            use_javascript (bool): JavaScriptを使用してクリックするかどうか
+
+        Returns:
+            bool: クリックが成功した場合はTrue、失敗した場合はFalse
+        """
+        if not self.driver:
+            logger.error("WebDriverが初期化されていません")
+            return False
+
+        try:
+            element = self.get_wait(timeout).until(
+                EC.element_to_be_clickable((by, value))
+            )
+        except TimeoutException:
+            logger.debug(f"クリック可能な要素が見つかりませんでした: {by}={value}")
+            return False
+        except WebDriverException as e:
+            # 不正なセレクタなど待機中のWebDriverエラーも、要素が見つからなかった場合と同様に扱う
+            logger.debug(f"要素の検索中にエラーが発生しました: {by}={value}, エラー: {e.msg}")
+            return False
+
+        try:
+            if use_javascript:
+                self.driver.execute_script("arguments[0].click();", element)
+            else:
+                element.click()
+            logger.info(f"✓ 要素のクリックに成功しました: {by}={value}")
+            return True
+        except Exception as e:
+            logger.error(f"要素のクリック中にエラーが発生しました: {by}={value}, エラー: {str(e)}")
+            return False
+
     def switch_to_new_window(self, current_handles=None, timeout=10, retries=3):
         """
         新しく開いたウィンドウに切り替える
@@ -669,6 +820,9 @@ class Browser:
                 logger.warning(f"WebDriver終了時にエラーが発生しました: {str(e)}")
             finally:
                 self.driver = None
+                # 終了したドライバに紐づく待機オブジェクトは再利用できない
+                self._waits = {}
+                self.wait = None
 
     def set_headless_mode(self, headless_mode):
         """
@@ -711,16 +865,14 @@ class Browser:
         """
         # エラーをログに記録
         if exception:
-            logger.error(f"{error_message}: {str(exception)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.error(f"{error_message}: {str(exception)}", exc_info=exception)
         else:
             logger.error(error_message)
         
         # スクリーンショットを撮影
         screenshot_path = None
         if self.driver:
-            error_screenshot = f"error_{datetime.now().strftime('%H%M%S')}.png"
+            error_screenshot = f"error_{datetime.now().strftime('%H%M%S')}_{next(_ERROR_SCREENSHOT_COUNTER)}.png"
             if self.save_screenshot(error_screenshot):
                 screenshot_path = os.path.join(self.screenshot_dir, error_screenshot)
         
@@ -938,8 +1090,7 @@ class Browser:
                 logger.error("WebDriverが初期化されていません")
                 return None
             
-            wait_timeout = timeout or self.timeout
-            return WebDriverWait(self.driver, wait_timeout).until(
+            return self.get_wait(timeout).until(
                 condition((by, value))
             )
         except TimeoutException:
@@ -957,6 +1108,9 @@ class Browser:
         Returns:
             str: システムのChromeバージョン
         """
+        import re
+        import subprocess
+        
         try:
             # Windowsの場合
             process = subprocess.Popen(
@@ -982,14 +1136,8 @@ class Browser:
             設定値。設定が見つからない場合はデフォルト値
         """
         try:
-            # BROWSERセクションから設定を読み込む
-            value = env.get_config_value("BROWSER", setting_name, default=default)
-            
-            # 文字列の "true" または "false" をブール値に変換
-            if isinstance(value, str) and value.lower() in ["true", "false"]:
-                return value.lower() == "true"
-            
-            return value
+            # 読み込み済みのBROWSERセクションから取得する（"true"/"false" はブール値に変換済み）
+            return self._browser_settings.get(setting_name, default)
             
         except Exception as e:
             logger.warning(f"スクリーンショット設定 {setting_name} の読み込みに失敗しました: {str(e)}")
@@ -6,18 +6,22 @@ EBiSログインページを操作するためのモジュール
 
 import os
 import time
+import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import traceback
 
 # プロジェクトルートへのパスを追加
 project_root = str(Path(__file__).parent.parent.parent.parent)
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
+)
 
 from src.utils.logging_config import get_logger
 from src.utils.environment import EnvironmentUtils as env
@@ -25,48 +29,185 @@ from src.modules.browser.browser import Browser
 
 logger = get_logger(__name__)
 
+# 再試行で解決する可能性がある接続系エラーのメッセージ
+_TRANSIENT_ERROR_MARKERS = (
+    "ERR_CONNECTION", "ERR_TIMED_OUT", "ERR_NETWORK_CHANGED", "ERR_INTERNET_DISCONNECTED",
+    "Connection refused", "Connection reset", "Connection aborted", "Max retries exceeded",
+)
+
+def _is_transient(exc):
+    """
+    再試行で解決する可能性があるエラーかどうかを判定する
+    
+    Args:
+        exc (Exception): 発生した例外
+        
+    Returns:
+        bool: タイムアウトや接続エラーなど一時的なエラーの場合はTrue
+    """
+    if isinstance(exc, (TimeoutException, StaleElementReferenceException, ConnectionError)):
+        return True
+    if isinstance(exc, WebDriverException):
+        message = exc.msg or ""
+        return any(marker in message for marker in _TRANSIENT_ERROR_MARKERS)
+    return False
+
 class EbisLoginPage:
     """
     EBiSログインページの操作を担当するクラス
     """
     
-    def __init__(self, browser=None):
+    # ログインページの要素ロケータ
+    ACCOUNT_KEY_INPUT = (By.ID, "account_key")
+    USERNAME_INPUT = (By.ID, "username")
+    PASSWORD_INPUT = (By.ID, "password")
+    LOGIN_BUTTON = (By.CSS_SELECTOR, "button.loginbtn")
+    ERROR_ALERT = (By.CSS_SELECTOR, ".alert-danger")
+    
+    # ログイン成功時のリダイレクト先（ダッシュボードのドメイン）
+    SUCCESS_DOMAIN = "bishamon.ebis.ne.jp"
+    
+    # ログインフォームの各項目を1回のスクリプト実行で入力する（見つからない項目のIDを返す）
+    # arguments[0]: [[要素ID, 入力値], ...]
+    FILL_LOGIN_FORM_SCRIPT = """
+    const fields = arguments[0];
+    const missing = fields.map(([id]) => id).filter(id => document.getElementById(id) === null);
+    if (missing.length) {
+        return missing;
+    }
+    for (const [id, value] of fields) {
+        const el = document.getElementById(id);
+        el.value = value;
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    return [];
+    """
+    
+    # 現在のURLとエラーメッセージの有無を1回のスクリプト実行で取得する
+    LOGIN_STATE_SCRIPT = """
+    const alert = document.querySelector(arguments[0]);
+    return {url: location.href, hasError: alert !== null, errorText: alert ? alert.innerText : ''};
+    """
+    
+    def __init__(self, browser=None, account_index=1, headless=False):
         """
         初期化
         
         Args:
-            browser (Browser, optional): 使用するブラウザインスタンス
+            browser (Browser, optional): 使用するブラウザインスタンス。
+                指定しない場合は最初に使用する時点で新しく作成する
+            account_index (int, optional): 使用するアカウントの番号。
+                環境変数 account_key{n}, username{n}, password{n} から認証情報を読み込む
+            headless (bool, optional): ブラウザを新しく作成する場合にヘッドレスモードで実行するかどうか
+                （Noneの場合はsettings.iniから読み込む）
         """
-        self.browser = browser
-        if not self.browser:
-            logger.info("ブラウザインスタンスが提供されていないため、新しく作成します")
-            self.browser = Browser(headless=False)
-            if not self.browser.setup():
-                logger.error("ブラウザのセットアップに失敗しました")
-                raise RuntimeError("ブラウザのセットアップに失敗しました")
+        self._browser = browser
+        self.headless = headless
         
         # 環境変数を確実に読み込む
         env.load_env()
         
         # ログイン情報を環境変数から取得
-        self.account_id = env.get_env_var("account_key1", "")
-        self.login_id = env.get_env_var("username1", "")
-        self.password = env.get_env_var("password1", "")
+        self.account_index = account_index
+        self.account_id = env.get_env_var(f"account_key{account_index}", "")
+        self.login_id = env.get_env_var(f"username{account_index}", "")
+        self.password = env.get_env_var(f"password{account_index}", "")
         
         # 必須情報の確認
         if not all([self.account_id, self.login_id, self.password]):
             logger.error("ログインに必要な環境変数が設定されていません")
-            raise ValueError("環境変数 account_key1, username1, password1 が必要です")
+            raise ValueError(
+                f"環境変数 account_key{account_index}, username{account_index}, password{account_index} が必要です"
+            )
         
-        # ログインページURL - 設定ファイルから取得
-        self.login_url = env.get_config_value("Credentials", "login_url", "")
+        # ログインフォームへの入力内容（[入力欄のID, 値] のリスト）は試行ごとに変わらないので一度だけ組み立てる
+        self._login_form_values = [
+            [self.ACCOUNT_KEY_INPUT[1], self.account_id],
+            [self.USERNAME_INPUT[1], self.login_id],
+            [self.PASSWORD_INPUT[1], self.password],
+        ]
+        
+        # ログインページURL・ダッシュボードURL - 設定ファイルから取得
+        credentials = env.get_config_section("Credentials")
+        self.login_url = credentials.get("login_url", "")
         if not self.login_url:
             logger.warning("設定ファイルからログインURLが取得できませんでした。デフォルト値を使用します。")
             self.login_url = "https://id.ebis.ne.jp/"
         logger.info(f"ログインURL: {self.login_url}")
+        self.dashboard_url = credentials.get("url_dashboard", "https://bishamon.ebis.ne.jp/dashboard")
+        # ダッシュボードの表示完了を判定する要素のCSSセレクタ（未設定の場合はURLのみで判定）
+        dashboard_ready_selector = credentials.get("dashboard_ready_selector", "")
+        self.dashboard_ready_locator = (By.CSS_SELECTOR, dashboard_ready_selector) if dashboard_ready_selector else None
         
         # 最大試行回数
         self.max_attempts = 3
+        
+        # 取得済み要素のキャッシュ（ロケータ -> WebElement）
+        self._element_cache = {}
+    
+    @property
+    def browser(self):
+        """
+        使用するブラウザインスタンス（未作成の場合はここで作成してセットアップする）
+        
+        Returns:
+            Browser: ブラウザインスタンス
+        """
+        if self._browser is None:
+            logger.info("ブラウザインスタンスが提供されていないため、新しく作成します")
+            browser = Browser(headless=self.headless)
+            if not browser.setup():
+                logger.error("ブラウザのセットアップに失敗しました")
+                raise RuntimeError("ブラウザのセットアップに失敗しました")
+            self._browser = browser
+        return self._browser
+    
+    def _get(self, locator):
+        """
+        ロケータに対応する要素を取得する（取得済みの場合はキャッシュを返す）
+        
+        Args:
+            locator (tuple): (By, 値) のロケータ
+            
+        Returns:
+            WebElement: 見つかった要素
+        """
+        element = self._element_cache.get(locator)
+        if element is None:
+            element = self.browser.driver.find_element(*locator)
+            self._element_cache[locator] = element
+        return element
+    
+    def _click(self, locator):
+        """
+        ロケータに対応する要素をクリックする（キャッシュした要素が古くなっていた場合は取得し直す）
+        
+        Args:
+            locator (tuple): (By, 値) のロケータ
+        """
+        try:
+            self._get(locator).click()
+        except StaleElementReferenceException:
+            logger.debug(f"キャッシュした要素が古くなっているため取得し直します: {locator}")
+            self._element_cache.pop(locator, None)
+            self._get(locator).click()
+    
+    def _dashboard_ready(self, driver):
+        """
+        ダッシュボードの表示が完了したかを判定する（WebDriverWaitの待機条件）
+        
+        Args:
+            driver (WebDriver): WebDriverインスタンス
+            
+        Returns:
+            bool: ダッシュボードURLに遷移し、判定用の要素が表示されている場合はTrue
+        """
+        if self.dashboard_url not in driver.current_url:
+            return False
+        if self.dashboard_ready_locator is None:
+            return True
+        return bool(driver.find_elements(*self.dashboard_ready_locator))
     
     def navigate_to_login_page(self):
         """
@@ -79,10 +220,11 @@ class EbisLoginPage:
             logger.info(f"ログインページにアクセスします: {self.login_url}")
             self.browser.navigate_to(self.login_url)
             
+            # ページが変わるためキャッシュした要素は使えない
+            self._element_cache.clear()
+            
             # ページが読み込まれるまで待機
-            WebDriverWait(self.browser.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "account_key"))
-            )
+            self.browser.get_wait(10).until(EC.presence_of_element_located(self.ACCOUNT_KEY_INPUT))
             
             logger.info("ログインページへのアクセスに成功しました")
             return True
@@ -92,8 +234,10 @@ class EbisLoginPage:
             return False
             
         except Exception as e:
-            logger.error(f"ログインページへのアクセス中にエラーが発生しました: {str(e)}")
-            logger.error(traceback.format_exc())
+            # 再試行しても解決しないエラーは呼び出し元に伝える（ログは呼び出し元で出力する）
+            if not _is_transient(e):
+                raise
+            logger.exception(f"ログインページへのアクセス中にエラーが発生しました: {str(e)}")
             return False
     
     def fill_login_form(self):
@@ -106,22 +250,12 @@ class EbisLoginPage:
         try:
             logger.info("ログインフォームに情報を入力します")
             
-            # アカウントID入力
-            account_id_input = self.browser.driver.find_element(By.ID, "account_key")
-            account_id_input.clear()
-            account_id_input.send_keys(self.account_id)
+            # アカウントID・ログインID・パスワードをまとめて入力
+            missing = self.browser.driver.execute_script(self.FILL_LOGIN_FORM_SCRIPT, self._login_form_values)
+            if missing:
+                raise NoSuchElementException(f"入力フィールドが見つかりません: {', '.join(missing)}")
             logger.debug(f"アカウントIDを入力しました: {self.account_id}")
-            
-            # ログインID入力
-            login_id_input = self.browser.driver.find_element(By.ID, "username")
-            login_id_input.clear()
-            login_id_input.send_keys(self.login_id)
             logger.debug(f"ログインIDを入力しました: {self.login_id}")
-            
-            # パスワード入力
-            password_input = self.browser.driver.find_element(By.ID, "password")
-            password_input.clear()
-            password_input.send_keys(self.password)
             logger.debug("パスワードを入力しました")
             
             logger.info("ログインフォームへの入力が完了しました")
@@ -132,8 +266,7 @@ class EbisLoginPage:
             return False
             
         except Exception as e:
-            logger.error(f"ログインフォームへの入力中にエラーが発生しました: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"ログインフォームへの入力中にエラーが発生しました: {str(e)}")
             return False
     
     def submit_login_form(self):
@@ -146,35 +279,26 @@ class EbisLoginPage:
         try:
             logger.info("ログインボタンをクリックします")
             
-            # ログインボタンをクリック
-            login_button = self.browser.driver.find_element(By.CSS_SELECTOR, "button.loginbtn")
-            login_button.click()
-            
-            # リダイレクトを待機
+            # ログインボタンをクリック（リダイレクト判定用にクリック前のURLを控えておく）
             start_url = self.browser.driver.current_url
             logger.info(f"クリック前のURL: {start_url}")
+            self._click(self.LOGIN_BUTTON)
             
-            # 一定時間待機してURLの変化を確認
+            # URLの変化かエラーメッセージの表示のどちらかが起きるまで待機（起きた時点ですぐに戻る）
             timeout = 15  # 15秒
-            wait_time = 0
-            check_interval = 1
-            
-            while wait_time < timeout:
-                time.sleep(check_interval)
-                wait_time += check_interval
-                current_url = self.browser.driver.current_url
-                
-                if current_url != start_url:
-                    logger.info(f"URLが変化しました: {current_url}")
-                    return True
-                
-                logger.debug(f"待機中... {wait_time}秒経過")
-            
-            # タイムアウトした場合でも、念のためURLをチェック
-            current_url = self.browser.driver.current_url
-            if current_url != start_url:
-                logger.info(f"待機後にURLが変化していました: {current_url}")
+            try:
+                result = self.browser.get_wait(timeout).until(EC.any_of(
+                    EC.url_changes(start_url),
+                    EC.presence_of_element_located(self.ERROR_ALERT)
+                ))
+                if isinstance(result, WebElement):
+                    # 成否の判定はcheck_login_successで行う
+                    logger.info("ログインページにエラーメッセージが表示されました")
+                else:
+                    logger.info(f"URLが変化しました: {self.browser.driver.current_url}")
                 return True
+            except TimeoutException:
+                pass
                 
             logger.warning(f"ログイン後のリダイレクトがタイムアウトしましたが、処理を続行します（{timeout}秒待機）")
             return True  # テスト用に仮に成功と扱う
@@ -184,8 +308,7 @@ class EbisLoginPage:
             return False
             
         except Exception as e:
-            logger.error(f"ログインフォームの送信中にエラーが発生しました: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"ログインフォームの送信中にエラーが発生しました: {str(e)}")
             return False
     
     def check_login_success(self):
@@ -196,26 +319,20 @@ class EbisLoginPage:
             bool: ログイン成功の場合はTrue、失敗の場合はFalse
         """
         try:
-            # 現在のURLが正しいかチェック
-            current_url = self.browser.driver.current_url
+            # 現在のURLとエラーメッセージの有無をまとめて取得
+            state = self.browser.driver.execute_script(self.LOGIN_STATE_SCRIPT, self.ERROR_ALERT[1])
+            current_url = state['url']
             logger.info(f"ログイン後のURL: {current_url}")
             
-            # 成功URL（ダッシュボードのドメイン）を設定ファイルから取得
-            success_domain = "bishamon.ebis.ne.jp"
-            
             # ログイン成功URLにリダイレクトされたかチェック
-            if success_domain in current_url:
+            if self.SUCCESS_DOMAIN in current_url:
                 logger.info("ログインに成功しました")
                 return True
                 
             # エラーメッセージの有無をチェック
-            try:
-                error_message = self.browser.driver.find_element(By.CLASS_NAME, "alert-danger")
-                logger.error(f"ログインエラーが表示されています: {error_message.text}")
+            if state['hasError']:
+                logger.error(f"ログインエラーが表示されています: {state['errorText']}")
                 return False
-            except NoSuchElementException:
-                # エラーメッセージがない場合はOK
-                pass
                 
             # ログインページから移動した場合は成功とみなす
             login_domain = self.login_url
@@ -225,15 +342,33 @@ class EbisLoginPage:
             else:
                 logger.info("ログインページから移動しました。ログイン成功と判断します")
                 return True
-                
-            logger.warning("ログイン状態が確認できません")
-            return False
             
         except Exception as e:
-            logger.error(f"ログイン確認中にエラーが発生しました: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"ログイン確認中にエラーが発生しました: {str(e)}")
             return False
     
+    def _resume_step(self, failed_index):
+        """
+        失敗したステップから再開できるかを判定し、再開するステップの位置を返す
+        
+        Args:
+            failed_index (int): 失敗したステップの位置
+            
+        Returns:
+            int: 再開するステップの位置（ログインページに留まっていない場合は0）
+        """
+        if failed_index == 0:
+            return 0
+        try:
+            # ログインページに留まっていれば入力済みのフォームをそのまま使える
+            # （ページが再描画されている可能性があるため要素は取得し直す）
+            if self.browser.driver.current_url.startswith(self.login_url):
+                self._element_cache.clear()
+                return failed_index
+        except Exception:
+            logger.debug("現在のURLを取得できないため、ログインページからやり直します")
+        return 0
+    
     def execute_login_flow(self):
         """
         ログイン処理の一連のフローを実行
@@ -241,24 +376,32 @@ class EbisLoginPage:
         Returns:
             bool: 成功した場合はTrue、失敗した場合はFalse
         """
+        # ログイン確認までの各ステップ（失敗時は安全な場合に限りそのステップから再開する）
+        steps = [
+            ("NAV", self.navigate_to_login_page, "ログインページへのアクセスに失敗しました"),
+            ("FILL", self.fill_login_form, "ログインフォームへの入力に失敗しました"),
+            ("SUBMIT", self.submit_login_form, "ログインフォームの送信に失敗しました"),
+        ]
+        start = 0
+        
         for attempt in range(1, self.max_attempts + 1):
             try:
-                logger.info(f"ログイン試行 {attempt}/{self.max_attempts}")
+                logger.info(f"ログイン試行 {attempt}/{self.max_attempts}（開始ステップ: {steps[start][0]}）")
                 
-                # ログインページに移動
-                if not self.navigate_to_login_page():
-                    logger.error("ログインページへのアクセスに失敗しました")
-                    continue
+                failed = None
+                for index in range(start, len(steps)):
+                    _, step, error_message = steps[index]
+                    if not step():
+                        logger.error(error_message)
+                        failed = index
+                        break
                 
-                # ログインフォームに情報を入力
-                if not self.fill_login_form():
-                    logger.error("ログインフォームへの入力に失敗しました")
+                if failed is not None:
+                    start = self._resume_step(failed)
                     continue
                 
-                # ログインフォームを送信
-                if not self.submit_login_form():
-                    logger.error("ログインフォームの送信に失敗しました")
-                    continue
+                # ログイン確認で失敗した場合はログインページからやり直す
+                start = 0
                 
                 # ログイン成功の確認
                 if self.check_login_success():
@@ -266,52 +409,96 @@ class EbisLoginPage:
                     
                     # ダッシュボードにアクセス（必須）
                     try:
-                        dashboard_url = env.get_config_value("Credentials", "url_dashboard", "https://bishamon.ebis.ne.jp/dashboard")
+                        dashboard_url = self.dashboard_url
                         logger.info(f"ダッシュボードにアクセスします: {dashboard_url}")
                         self.browser.navigate_to(dashboard_url)
                         
-                        # ページ読み込み完了を待機
-                        WebDriverWait(self.browser.driver, 10).until(
-                            lambda driver: driver.execute_script("return document.readyState") == "complete"
-                        )
-                        logger.info("ダッシュボードページの読み込みが完了しました")
-                        
-                        # 追加の待機時間
-                        time.sleep(2)
-                        
-                        # 念のためURLを確認
-                        current_url = self.browser.driver.current_url
-                        if dashboard_url in current_url:
+                        # ダッシュボードURLへの遷移と表示完了を待機（navigate_toで読み込み完了は待機済み）
+                        try:
+                            self.browser.get_wait(15).until(self._dashboard_ready)
                             logger.info(f"ダッシュボードURL ({dashboard_url}) に正常に遷移しました")
-                        else:
+                        except TimeoutException:
+                            current_url = self.browser.driver.current_url
                             logger.warning(f"ダッシュボードへの遷移に問題がある可能性があります。現在のURL: {current_url}")
                     except Exception as e:
-                        logger.warning(f"ダッシュボードへのアクセス中にエラーが発生しました: {str(e)}")
-                        logger.error(traceback.format_exc())
+                        logger.warning(f"ダッシュボードへのアクセス中にエラーが発生しました: {str(e)}", exc_info=True)
                     
                     return True
                 
                 logger.warning(f"{attempt}回目のログイン試行が失敗しました")
                 
             except Exception as e:
-                logger.error(f"ログイン処理中に予期しないエラーが発生しました: {str(e)}")
-                logger.error(traceback.format_exc())
+                logger.exception(f"ログイン処理中に予期しないエラーが発生しました: {str(e)}")
+                if not _is_transient(e):
+                    logger.error("再試行しても解決しないエラーのため、ログイン処理を中止します")
+                    return False
+                start = 0
             
-            # 次の試行前に少し待機
-            time.sleep(3)
+            # 次の試行前に待機（試行ごとに待機時間を倍にし、ゆらぎを加える。最後の試行後は待たない）
+            if attempt < self.max_attempts:
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 4.0) + random.uniform(0, 0.25))
         
         logger.error(f"{self.max_attempts}回の試行後もログインに失敗しました")
         return False
         
+def _login_account(account_index, headless=None):
+    """
+    1つのアカウントでログインし、使用したブラウザを終了する（run_parallel_loginsのワーカー）
+    
+    Args:
+        account_index (int): 使用するアカウントの番号
+        headless (bool, optional): ヘッドレスモードで実行するかどうか（Noneの場合はsettings.iniから読み込む）
+        
+    Returns:
+        bool: ログインに成功した場合はTrue、失敗した場合はFalse
+    """
+    login_page = None
+    try:
+        login_page = EbisLoginPage(account_index=account_index, headless=headless)
+        return login_page.execute_login_flow()
+    except Exception as e:
+        logger.exception(f"アカウント{account_index}のログイン中にエラーが発生しました: {str(e)}")
+        return False
+    finally:
+        if login_page is not None and login_page._browser is not None:
+            login_page._browser.quit()
+
+def run_parallel_logins(account_indexes, max_workers=None, headless=None):
+    """
+    複数のアカウントのログインを別々のプロセス・ブラウザで並列に実行する
+    
+    Windowsなどspawn方式でプロセスを起動する環境では、呼び出し元を
+    if __name__ == "__main__": の中に置く必要がある
+    
+    Args:
+        account_indexes (list[int]): ログインするアカウントの番号のリスト
+        max_workers (int, optional): 同時に起動するブラウザの最大数。指定しない場合はアカウント数
+        headless (bool, optional): ヘッドレスモードで実行するかどうか（Noneの場合はsettings.iniから読み込む）
+        
+    Returns:
+        dict[int, bool]: アカウントの番号とログイン結果の辞書
+    """
+    account_indexes = list(account_indexes)
+    if not account_indexes:
+        return {}
+    
+    logger.info(f"{len(account_indexes)}件のアカウントで並列にログインします")
+    with ProcessPoolExecutor(max_workers=max_workers or len(account_indexes)) as executor:
+        results = dict(zip(
+            account_indexes,
+            executor.map(_login_account, account_indexes, [headless] * len(account_indexes))
+        ))
+    
+    succeeded = sum(results.values())
+    logger.info(f"並列ログインが完了しました（成功: {succeeded}/{len(results)}）")
+    return results
+
 def main():
     """
     テスト用のメイン関数
     """
     try:
-        # 環境変数を読み込む
-        env.load_env()
-        
-        # ログインページのインスタンスを作成
+        # ログインページのインスタンスを作成（環境変数はインスタンス作成時に読み込まれる）
         login_page = EbisLoginPage()
         
         # ログイン処理を実行
@@ -328,8 +515,7 @@ def main():
             return 1
             
     except Exception as e:
-        logger.error(f"テスト実行中にエラーが発生しました: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"テスト実行中にエラーが発生しました: {str(e)}")
         return 1
 
 if __name__ == "__main__":
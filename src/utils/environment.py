@@ -1,15 +1,57 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 import configparser
 
+
+@lru_cache(maxsize=8)
+def _read_config(config_path: str, mtime: float) -> configparser.ConfigParser:
+    """
+    設定ファイルを解析します。パスと更新時刻をキーにキャッシュされるため、
+    ファイルが更新されない限り再解析しません。
+
+    Args:
+        config_path (str): 設定ファイルのパス
+        mtime (float): 設定ファイルの更新時刻
+
+    Returns:
+        configparser.ConfigParser: 解析済みの設定（呼び出し側で変更しないこと）
+    """
+    config = configparser.ConfigParser()
+    # utf-8 エンコーディングで読み込む
+    config.read(config_path, encoding='utf-8')
+    return config
+
+
+def _convert_value(value: str) -> Any:
+    """
+    設定値の文字列を int / float / bool に変換します。
+
+    Args:
+        value (str): 設定値
+
+    Returns:
+        Any: 変換後の値（変換できない場合は元の文字列）
+    """
+    if value.isdigit():
+        return int(value)
+    if value.replace('.', '', 1).isdigit():
+        return float(value)
+    if value.lower() in ['true', 'false']:
+        return value.lower() == 'true'
+    return value
+
 class EnvironmentUtils:
     """プロジェクト全体で使用する環境関連のユーティリティクラス"""
 
     # プロジェクトルートのデフォルト値
     BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+    # 読み込み済みの .env ファイル（パス -> 更新時刻）
+    _loaded_env_files: Dict[str, float] = {}
+
     @staticmethod
     def set_project_root(path: Path) -> None:
         """
@@ -30,20 +72,26 @@ class EnvironmentUtils:
         """
         return EnvironmentUtils.BASE_DIR
 
-    @staticmethod
-    def load_env(env_file: Optional[Path] = None) -> None:
+    @classmethod
+    def load_env(cls, env_file: Optional[Path] = None) -> None:
         """
         環境変数を .env ファイルからロードします。
+        同じファイルが更新されていない場合は再読み込みしません。
 
         Args:
             env_file (Optional[Path]): .env ファイルのパス
         """
-        env_file = env_file or (EnvironmentUtils.BASE_DIR / "config" / "secrets.env")
+        env_file = env_file or (cls.BASE_DIR / "config" / "secrets.env")
 
         if not env_file.exists():
             raise FileNotFoundError(f"{env_file} が見つかりません。正しいパスを指定してください。")
 
+        mtime = env_file.stat().st_mtime
+        if cls._loaded_env_files.get(str(env_file)) == mtime:
+            return
+
         load_dotenv(env_file)
+        cls._loaded_env_files[str(env_file)] = mtime
 
     @staticmethod
     def get_env_var(key: str, default: Optional[Any] = None) -> Any:
@@ -91,11 +139,7 @@ class EnvironmentUtils:
         Returns:
             Any: 設定値
         """
-        config_path = EnvironmentUtils.get_config_file()
-        config = configparser.ConfigParser()
-
-        # utf-8 エンコーディングで読み込む
-        config.read(config_path, encoding='utf-8')
+        config = EnvironmentUtils._load_config()
 
         if not config.has_section(section):
             return default
@@ -105,13 +149,36 @@ class EnvironmentUtils:
         value = config.get(section, key, fallback=default)
 
         # 型変換
-        if value.isdigit():
-            return int(value)
-        if value.replace('.', '', 1).isdigit():
-            return float(value)
-        if value.lower() in ['true', 'false']:
-            return value.lower() == 'true'
-        return value
+        return _convert_value(value)
+
+    @staticmethod
+    def get_config_section(section: str) -> Dict[str, Any]:
+        """
+        設定ファイルから指定のセクションの全ての値を取得します。
+
+        Args:
+            section (str): セクション名
+
+        Returns:
+            Dict[str, Any]: キーと型変換済みの値の辞書（セクションがない場合は空の辞書）
+        """
+        config = EnvironmentUtils._load_config()
+
+        if not config.has_section(section):
+            return {}
+
+        return {key: _convert_value(value) for key, value in config.items(section)}
+
+    @staticmethod
+    def _load_config() -> configparser.ConfigParser:
+        """
+        settings.ini を読み込みます。解析結果はファイルが更新されるまで再利用されます。
+
+        Returns:
+            configparser.ConfigParser: 解析済みの設定
+        """
+        config_path = EnvironmentUtils.get_config_file()
+        return _read_config(str(config_path), config_path.stat().st_mtime)
 
     @staticmethod
     def resolve_path(path: str) -> Path:
@@ -1,12 +1,35 @@
 # logging_config.py
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+class _PassThroughQueueHandler(logging.handlers.QueueHandler):
+    """
+    ログレコードを書式化せずにそのままキューへ積むハンドラー
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        同一プロセス内のキューに積むため、メッセージや例外情報の書式化は出力スレッドに任せます。
+
+        Args:
+            record (logging.LogRecord): ログレコード
+
+        Returns:
+            logging.LogRecord: 受け取ったログレコード（変更なし）
+        """
+        return record
+
+
 class LoggingConfig:
     _initialized = False
+    _queue_handler: Optional[logging.handlers.QueueHandler] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
 
     def __init__(self):
         """
@@ -39,13 +62,60 @@ class LoggingConfig:
             logging.StreamHandler(),
         ]
 
-        logging.basicConfig(
-            level=self.log_level,
-            format=self.log_format,
-            handlers=handlers,
+        formatter = logging.Formatter(self.log_format)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        # basicConfigと同様、ルートロガーが設定済みの場合は変更しない
+        root = logging.getLogger()
+        if not root.handlers:
+            # 呼び出し元はキューに積むだけにし、行の書式化とファイル・コンソールへの出力はバックグラウンドのスレッドで行う
+            LoggingConfig._queue_handler = _PassThroughQueueHandler(queue.Queue(-1))
+            root.addHandler(LoggingConfig._queue_handler)
+            root.setLevel(self.log_level)
+            LoggingConfig._start_listener(handlers)
+            atexit.register(LoggingConfig._stop_listener)
+            if hasattr(os, "register_at_fork"):
+                # fork先のプロセスには出力スレッドが引き継がれないため、ハンドラーへ直接出力する
+                os.register_at_fork(after_in_child=LoggingConfig._use_direct_handlers_in_child)
+
+        root.info("Logging setup complete.")
+
+    @staticmethod
+    def _start_listener(handlers) -> None:
+        """
+        キューに積まれたログを出力するスレッドを起動します。
+
+        Args:
+            handlers: 出力先のハンドラー
+        """
+        LoggingConfig._listener = logging.handlers.QueueListener(
+            LoggingConfig._queue_handler.queue, *handlers, respect_handler_level=True
         )
+        LoggingConfig._listener.start()
 
-        logging.getLogger().info("Logging setup complete.")
+    @staticmethod
+    def _stop_listener() -> None:
+        """
+        キューに残っているログを出力してからスレッドを停止します。
+        """
+        if LoggingConfig._listener is not None:
+            LoggingConfig._listener.stop()
+            LoggingConfig._listener = None
+
+    @staticmethod
+    def _use_direct_handlers_in_child() -> None:
+        """
+        fork先のプロセスで、キューを介さずに出力先のハンドラーへ直接書き込むように切り替えます。
+        """
+        if LoggingConfig._listener is None:
+            return
+        root = logging.getLogger()
+        root.removeHandler(LoggingConfig._queue_handler)
+        for handler in LoggingConfig._listener.handlers:
+            root.addHandler(handler)
+        LoggingConfig._queue_handler = None
+        LoggingConfig._listener = None
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
@@ -27,6 +27,9 @@ class SlackNotifier:
     Slack通知を送信するユーティリティクラス
     """
     
+    # get_instanceで共有するインスタンス
+    _instance: Optional['SlackNotifier'] = None
+    
     def __init__(self, webhook_url: Optional[str] = None):
         """
         SlackNotifierの初期化
@@ -55,6 +58,9 @@ class SlackNotifier:
             # URLの形式を確認（機密情報のためマスク表示）
             masked_url = self.webhook_url[:30] + "..." if len(self.webhook_url) > 30 else self.webhook_url
             logger.info(f"Slack Webhook URL: {masked_url}")
+        
+        # 通知ごとに接続を張り直さないよう、HTTPセッションを使い回す
+        self._session = requests.Session()
     
     def send_message(self, message: str, title: Optional[str] = None, 
                      color: str = "#36a64f", fields: Optional[Dict[str, str]] = None) -> bool:
@@ -134,7 +140,7 @@ class SlackNotifier:
             
             # POSTリクエストを送信
             logger.info(f"Slack通知を送信しています: {title}")
-            response = requests.post(
+            response = self._session.post(
                 self.webhook_url,
                 data=json.dumps(payload),
                 headers={"Content-Type": "application/json"}
@@ -163,8 +169,7 @@ class SlackNotifier:
                 return False
                 
         except Exception as e:
-            logger.error(f"Slack通知の送信中にエラーが発生しました: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Slack通知の送信中にエラーが発生しました: {str(e)}")
             return False
     
     def send_error(self, error_message: str, exception: Optional[Exception] = None, 
@@ -208,7 +213,11 @@ class SlackNotifier:
         """
         SlackNotifierのシングルトンインスタンスを取得
         
+        初回の呼び出し時にのみ作成し、以降は同じインスタンスを返す
+        
         Returns:
             SlackNotifier: SlackNotifierのインスタンス
         """
-        return SlackNotifier() 
\ No newline at end of file
+        if SlackNotifier._instance is None:
+            SlackNotifier._instance = SlackNotifier()
+        return SlackNotifier._instance
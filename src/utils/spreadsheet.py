@@ -8,10 +8,13 @@ Google Spreadsheetを操作するためのユーティリティモジュール
 CSVファイルからのデータインポートなどの機能を提供します。
 """
 
+import io
 import os
 import csv
 import time
+import threading
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
 
@@ -24,6 +27,48 @@ from src.utils.environment import EnvironmentUtils as env
 
 logger = get_logger(__name__)
 
+class _WriteRateLimiter:
+    """
+    Sheets APIへの書き込みリクエスト数を制限するトークンバケット
+    
+    上限に達するまでは待機せずに送信し、超えそうな場合だけ必要な時間だけ待機する
+    """
+    
+    def __init__(self, requests_per_minute: int = 60, burst: int = 10):
+        """
+        初期化
+        
+        Args:
+            requests_per_minute (int): 1分あたりの書き込みリクエスト数の上限（Sheets APIのユーザーごとの割り当て）
+            burst (int): 待機せずに連続して送信できるリクエスト数
+        """
+        if not 0 < burst < requests_per_minute:
+            raise ValueError("burst must be positive and smaller than requests_per_minute")
+        # 最初の1分間でも「バースト分 + 補充分」が上限を超えないよう、補充速度は上限からバースト分を差し引いて決める
+        self.rate = (requests_per_minute - burst) / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """
+        書き込みリクエスト1回分の枠を確保する（枠がない場合は空くまで待機する）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / self.rate
+                logger.debug(f"Waiting {wait_time:.2f}s for Sheets API write quota")
+                time.sleep(wait_time)
+                self.tokens = 1.0
+                self.updated = time.monotonic()
+            
+            self.tokens -= 1
+
 class SpreadsheetManager:
     """
     Google Spreadsheetを操作するためのクラス
@@ -71,6 +116,9 @@ class SpreadsheetManager:
         self.client = self._authenticate()
         self.spreadsheet = None
         
+        # 書き込みリクエストの送信ペースを調整する
+        self._write_limiter = _WriteRateLimiter()
+        
         logger.info(f"SpreadsheetManager initialized with spreadsheet ID: {self.spreadsheet_id}")
         logger.info(f"Using credential file: {self.credential_path}")
     
@@ -97,9 +145,7 @@ class SpreadsheetManager:
             return client
             
         except Exception as e:
-            logger.error(f"Authentication failed: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Authentication failed: {str(e)}")
             raise
     
     def open_spreadsheet(self) -> gspread.Spreadsheet:
@@ -118,9 +164,7 @@ class SpreadsheetManager:
             logger.error(f"Spreadsheet not found with ID: {self.spreadsheet_id}")
             raise
         except Exception as e:
-            logger.error(f"Failed to open spreadsheet: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to open spreadsheet: {str(e)}")
             raise
     
     def get_worksheet(self, sheet_key: str) -> gspread.Worksheet:
@@ -173,9 +217,7 @@ class SpreadsheetManager:
             return worksheet
             
         except Exception as e:
-            logger.error(f"Failed to get worksheet '{sheet_name}': {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to get worksheet '{sheet_name}': {str(e)}")
             raise
     
     def get_worksheet_by_gid(self, gid: int) -> gspread.Worksheet:
@@ -206,9 +248,7 @@ class SpreadsheetManager:
             raise ValueError(f"Worksheet with GID {gid} not found")
             
         except Exception as e:
-            logger.error(f"Failed to get worksheet with GID {gid}: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to get worksheet with GID {gid}: {str(e)}")
             raise
     
     def clear_worksheet(self, sheet_key: str) -> None:
@@ -223,18 +263,18 @@ class SpreadsheetManager:
         try:
             # ヘッダー行を保持するため、2行目以降をクリア
             if worksheet.row_count > 1:
+                self._write_limiter.acquire()
                 worksheet.batch_clear(["A2:ZZ"])
                 logger.info(f"Successfully cleared worksheet: {worksheet.title}")
             else:
                 logger.warning(f"Worksheet {worksheet.title} has no data to clear")
                 
         except Exception as e:
-            logger.error(f"Failed to clear worksheet: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to clear worksheet: {str(e)}")
             raise
     
-    def import_csv_to_sheet(self, csv_path: str, sheet_key: str, has_header: bool = True) -> None:
+    def import_csv_to_sheet(self, csv_path: str, sheet_key: str, has_header: bool = True,
+                            max_workers: int = 4) -> None:
         """
         CSVファイルからデータをシートにインポートする
         
@@ -242,6 +282,7 @@ class SpreadsheetManager:
             csv_path (str): CSVファイルのパス
             sheet_key (str): シートのキー ('users_all', 'entryprocess_all', 'logging')
             has_header (bool, optional): CSVファイルにヘッダーがあるかどうか。デフォルトはTrue。
+            max_workers (int, optional): 同時に送信するバッチ数の上限。デフォルトは4。
         """
         if not os.path.exists(csv_path):
             logger.error(f"CSV file not found: {csv_path}")
@@ -250,16 +291,18 @@ class SpreadsheetManager:
         worksheet = self.get_worksheet(sheet_key)
         
         try:
-            # CSVファイルを読み込む（複数の文字コードを試す）
+            # CSVファイルを読み込む（ファイルは1回だけバイト列で読み、複数の文字コードでのデコードを試す）
             encodings = ['utf-8-sig', 'utf-8', 'shift-jis', 'cp932']
             data = None
             used_encoding = None
             
+            with open(csv_path, 'rb') as f:
+                raw = f.read()
+            
             for encoding in encodings:
                 try:
-                    with open(csv_path, 'r', encoding=encoding) as f:
-                        csv_reader = csv.reader(f)
-                        data = list(csv_reader)
+                    text = raw.decode(encoding)
+                    data = list(csv.reader(io.StringIO(text, newline=None)))
                     used_encoding = encoding
                     logger.info(f"Successfully read CSV file with encoding: {encoding}")
                     break
@@ -286,6 +329,7 @@ class SpreadsheetManager:
                 # ヘッダー行を更新
                 header = data[0]
                 logger.info(f"Header row: {header}")
+                self._write_limiter.acquire()
                 worksheet.update('A1', [header])
                 # データは2行目から
                 data = data[1:]
@@ -302,32 +346,36 @@ class SpreadsheetManager:
                 batch_size = 1000  # Google Sheets APIの制限に基づく適切な値
                 total_batches = (len(data) + batch_size - 1) // batch_size  # 切り上げ除算
                 
-                for i in range(0, len(data), batch_size):
+                def upload_batch(i: int) -> None:
                     batch_num = i // batch_size + 1
-                    logger.info(f"Uploading batch {batch_num}/{total_batches} ({len(data[i:i+batch_size])} rows)")
-                    
                     batch_data = data[i:i+batch_size]
+                    logger.info(f"Uploading batch {batch_num}/{total_batches} ({len(batch_data)} rows)")
+                    
                     range_str = f'A{start_row + i}:ZZ{start_row + i + len(batch_data) - 1}'
                     
                     try:
+                        # API制限に引っかからないよう、必要な場合だけ待機してから送信
+                        self._write_limiter.acquire()
                         worksheet.update(range_str, batch_data)
                         logger.info(f"Successfully updated range: {range_str}")
                     except Exception as e:
-                        logger.error(f"Failed to update range {range_str}: {str(e)}")
+                        logger.exception(f"Failed to update range {range_str}: {str(e)}")
                         # エラーが発生しても処理を継続
-                        import traceback
-                        logger.error(traceback.format_exc())
-                    
-                    # API制限に引っかからないよう少し待機
-                    if i + batch_size < len(data):
-                        time.sleep(1)
+                
+                # 各バッチの書き込み範囲は重ならないため、通信待ちが重なるよう並行して送信する
+                # （送信数の上限は_write_limiterで全スレッド共通に管理する）
+                batch_starts = range(0, len(data), batch_size)
+                if total_batches > 1 and max_workers > 1:
+                    with ThreadPoolExecutor(max_workers=min(max_workers, total_batches)) as executor:
+                        list(executor.map(upload_batch, batch_starts))
+                else:
+                    for i in batch_starts:
+                        upload_batch(i)
             
             logger.info(f"Successfully imported {len(data)} rows from CSV to worksheet: {worksheet.title}")
             
         except Exception as e:
-            logger.error(f"Failed to import CSV to worksheet: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to import CSV to worksheet: {str(e)}")
             raise
     
     def append_log(self, log_data: List[str]) -> None:
@@ -340,11 +388,10 @@ class SpreadsheetManager:
         worksheet = self.get_worksheet('logging')
         
         try:
+            self._write_limiter.acquire()
             worksheet.append_row(log_data)
             logger.info(f"Successfully appended log data: {log_data}")
             
         except Exception as e:
-            logger.error(f"Failed to append log data: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to append log data: {str(e)}")
             # ログの追加に失敗してもプログラムは継続 
\ No newline at end of file
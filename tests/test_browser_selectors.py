@@ -2,13 +2,16 @@ import unittest
 import os
 import sys
 import time
+import tempfile
 from pathlib import Path
+from unittest import mock
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.modules.browser.browser import Browser
+from src.modules.browser import browser as browser_module
+from src.modules.browser.browser import Browser, _parse_selectors_csv
 from src.utils.logging_config import get_logger
 
 logger = get_logger('browser_selector_test')
@@ -165,5 +168,79 @@ class BrowserSelectorTest(unittest.TestCase):
         
         logger.info("フォールバックセレクタのテスト成功")
 
+class SelectorsCsvTest(unittest.TestCase):
+    """セレクタCSVの解析と解析結果のキャッシュをテストするクラス（ブラウザは起動しない）"""
+    
+    HEADER = "group,name,selector_type,selector_value\n"
+    
+    def setUp(self):
+        """各テスト実行前に実行"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "selectors.csv")
+        browser_module._SELECTORS_CACHE.clear()
+    
+    def tearDown(self):
+        """各テスト実行後に実行"""
+        browser_module._SELECTORS_CACHE.clear()
+        self.temp_dir.cleanup()
+    
+    def _write(self, content, mtime=None):
+        """テスト用のセレクタCSVを書き込む"""
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+    
+    def _new_browser(self):
+        """WebDriverや設定ファイルを使わずに、セレクタの読み込みに必要な属性だけを持つBrowserを作成する"""
+        browser = Browser.__new__(Browser)
+        browser.selectors_path = self.path
+        browser.selectors = {}
+        browser._locator_cache = {}
+        return browser
+    
+    def test_parse_selectors(self):
+        """各行がグループ・名前ごとのセレクタ情報に変換されることを確認する"""
+        self._write(self.HEADER + 'login,username,id,username\nlogin,submit,css,"button.a, button.b"\n')
+        
+        self.assertEqual(_parse_selectors_csv(self.path), {
+            "login": {
+                "username": {"selector_type": "id", "selector_value": "username"},
+                "submit": {"selector_type": "css", "selector_value": "button.a, button.b"},
+            }
+        })
+    
+    def test_missing_header_or_column(self):
+        """ヘッダーがない場合や必要な列が足りない場合は空の辞書を返すことを確認する"""
+        self._write("")
+        self.assertEqual(_parse_selectors_csv(self.path), {})
+        
+        self._write("group,name,selector_type\nlogin,username,id\n")
+        self.assertEqual(_parse_selectors_csv(self.path), {})
+    
+    def test_short_rows_are_skipped(self):
+        """列数が足りない行や空行は読み飛ばすことを確認する"""
+        self._write(self.HEADER + "login,username\n\nlogin,password,id,password\n")
+        
+        self.assertEqual(_parse_selectors_csv(self.path), {
+            "login": {"password": {"selector_type": "id", "selector_value": "password"}}
+        })
+    
+    def test_cache_reused_until_file_changes(self):
+        """更新時刻が同じ間は解析結果を再利用し、ファイルが更新されたら読み直すことを確認する"""
+        self._write(self.HEADER + "login,username,id,username\n", mtime=1_700_000_000)
+        
+        with mock.patch.object(browser_module, "_parse_selectors_csv", wraps=_parse_selectors_csv) as parse:
+            self.assertTrue(self._new_browser()._load_selectors())
+            self.assertTrue(self._new_browser()._load_selectors())
+            self.assertEqual(parse.call_count, 1)
+            
+            self._write(self.HEADER + "login,username,css,#user\n", mtime=1_700_000_100)
+            browser = self._new_browser()
+            self.assertTrue(browser._load_selectors())
+            self.assertEqual(parse.call_count, 2)
+        
+        self.assertEqual(browser.selectors["login"]["username"], {"selector_type": "css", "selector_value": "#user"})
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
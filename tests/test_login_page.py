@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+from unittest import mock
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.modules.browser import login_page as login_page_module
+from src.modules.browser.login_page import EbisLoginPage
+
+
+class LoginFlowTest(unittest.TestCase):
+    """execute_login_flow の再試行・再開の判定をテストするクラス（ブラウザは起動しない）"""
+
+    LOGIN_URL = "https://id.ebis.ne.jp/"
+
+    def setUp(self):
+        """各テスト実行前に実行"""
+        # 環境変数や設定ファイルを読まずに、ログインフローに必要な属性だけを持つインスタンスを作成する
+        self.page = EbisLoginPage.__new__(EbisLoginPage)
+        self.page.login_url = self.LOGIN_URL
+        self.page.dashboard_url = "https://bishamon.ebis.ne.jp/dashboard"
+        self.page.max_attempts = 3
+        self.page._element_cache = {}
+        self.page._browser = mock.MagicMock()
+
+        self.page.navigate_to_login_page = mock.Mock(return_value=True)
+        self.page.fill_login_form = mock.Mock(return_value=True)
+        self.page.submit_login_form = mock.Mock(return_value=True)
+        self.page.check_login_success = mock.Mock(return_value=True)
+
+        # 再試行前の待機を省く
+        patcher = mock.patch.object(login_page_module.time, "sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_submit_on_login_page_resumes_at_submit(self):
+        """ログインページに留まったまま送信に失敗した場合は、送信ステップから再開することを確認する"""
+        self.page.submit_login_form.side_effect = [False, True]
+        self.page._browser.driver.current_url = self.LOGIN_URL + "login"
+
+        self.assertTrue(self.page.execute_login_flow())
+
+        self.assertEqual(self.page.navigate_to_login_page.call_count, 1)
+        self.assertEqual(self.page.fill_login_form.call_count, 1)
+        self.assertEqual(self.page.submit_login_form.call_count, 2)
+
+    def test_failed_submit_after_leaving_login_page_restarts(self):
+        """ログインページから移動した後に送信に失敗した場合は、ログインページからやり直すことを確認する"""
+        self.page.submit_login_form.side_effect = [False, True]
+        self.page._browser.driver.current_url = "https://bishamon.ebis.ne.jp/error"
+
+        self.assertTrue(self.page.execute_login_flow())
+
+        self.assertEqual(self.page.navigate_to_login_page.call_count, 2)
+        self.assertEqual(self.page.fill_login_form.call_count, 2)
+
+    def test_non_transient_error_aborts_after_one_attempt(self):
+        """再試行しても解決しないエラーの場合は、1回目の試行で中止することを確認する"""
+        self.page.navigate_to_login_page.side_effect = ValueError("unexpected")
+
+        self.assertFalse(self.page.execute_login_flow())
+
+        self.assertEqual(self.page.navigate_to_login_page.call_count, 1)
+        self.page.fill_login_form.assert_not_called()
+        self.sleep.assert_not_called()
+
+class ElementCacheTest(unittest.TestCase):
+    """ログインフォーム要素のキャッシュをテストするクラス（ブラウザは起動しない）"""
+
+    def setUp(self):
+        """各テスト実行前に実行"""
+        self.page = EbisLoginPage.__new__(EbisLoginPage)
+        self.page._element_cache = {}
+        self.page._browser = mock.MagicMock()
+
+    def test_stale_cached_element_is_refetched(self):
+        """キャッシュした要素が古くなっていた場合は取得し直してクリックすることを確認する"""
+        stale = mock.Mock()
+        stale.click.side_effect = StaleElementReferenceException("stale")
+        fresh = mock.Mock()
+        self.page._element_cache[EbisLoginPage.LOGIN_BUTTON] = stale
+        self.page._browser.driver.find_element.return_value = fresh
+
+        self.page._click(EbisLoginPage.LOGIN_BUTTON)
+
+        fresh.click.assert_called_once_with()
+        self.assertIs(self.page._element_cache[EbisLoginPage.LOGIN_BUTTON], fresh)
+
+if __name__ == "__main__":
+    unittest.main()
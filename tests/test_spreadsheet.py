@@ -0,0 +1,67 @@
+import unittest
+import importlib.util
+import os
+import sys
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HAS_GSPREAD = importlib.util.find_spec("gspread") is not None
+if HAS_GSPREAD:
+    from src.utils import spreadsheet as spreadsheet_module
+    from src.utils.spreadsheet import _WriteRateLimiter
+
+
+@unittest.skipUnless(HAS_GSPREAD, "gspread がインストールされていません")
+class WriteRateLimiterTest(unittest.TestCase):
+    """Sheets API書き込み用のトークンバケットをテストするクラス（時刻と待機は差し替える）"""
+
+    def setUp(self):
+        """各テスト実行前に実行"""
+        self.now = 0.0
+        self.sleeps = []
+
+        def fake_sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        patcher = mock.patch.multiple(
+            spreadsheet_module.time,
+            monotonic=mock.Mock(side_effect=lambda: self.now),
+            sleep=mock.Mock(side_effect=fake_sleep),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_passes_without_waiting(self):
+        """バースト分までは待機せずに送信し、超えた分は補充されるまで待機することを確認する"""
+        limiter = _WriteRateLimiter(requests_per_minute=60, burst=10)
+
+        for _ in range(10):
+            limiter.acquire()
+        self.assertEqual(self.sleeps, [])
+
+        limiter.acquire()
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertAlmostEqual(self.sleeps[0], 60 / 50)
+
+    def test_first_minute_stays_within_quota(self):
+        """最初の1分間に送信できるリクエスト数が上限を超えないことを確認する"""
+        limiter = _WriteRateLimiter(requests_per_minute=60, burst=10)
+
+        sent = 0
+        while True:
+            limiter.acquire()
+            if self.now > 60:
+                break
+            sent += 1
+
+        self.assertLessEqual(sent, 60)
+
+    def test_burst_must_be_smaller_than_quota(self):
+        """バースト数が上限以上の場合はエラーになることを確認する"""
+        with self.assertRaises(ValueError):
+            _WriteRateLimiter(requests_per_minute=10, burst=10)
+
+if __name__ == "__main__":
+    unittest.main()